@@ -0,0 +1,83 @@
+"""
+Load driver, for a running server.
+
+Sends concurrent requests to the main routes and reports the throughput and latency percentiles, as JSON.
+
+    python scripts/load_test.py --url http://127.0.0.1:8000 --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+from statistics import median
+from time import perf_counter
+from uuid import uuid4
+
+import httpx
+
+
+def percentile(samples: list[float], rank: float) -> float:
+    """Return the percentile of the samples, with the nearest rank method."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(rank / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def drive(client: httpx.AsyncClient, request: dict, total: int, concurrency: int) -> dict:
+    """Send the request total times, with concurrency requests in flight, and return the statistics."""
+    samples: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = perf_counter()
+            response = await client.request(**request)
+            samples.append(perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    return {
+        "requests": total,
+        "errors": errors,
+        "requests_per_second": round(total / elapsed, 3),
+        "p50_ms": round(median(samples) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+async def main(url: str, total: int, concurrency: int, logins: int) -> dict:
+    """Create a user, and load the routes."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        password = "P@ssw0rd-" + uuid4().hex[:8]
+        email = uuid4().hex + "@example.com"
+        user = {"username": "load" + uuid4().hex[:8], "name": "Load Test", "email": email, "password": password}
+        (await client.post("/admin/users/", json=user)).raise_for_status()
+        credentials = {"username": email, "password": password}
+        token = (await client.post("/auth/login", json=credentials)).json()["access_token"]
+        routes = {
+            "POST /auth/login": ({"method": "POST", "url": "/auth/login", "json": credentials}, logins),
+            "GET /about/": (
+                {"method": "GET", "url": "/about/", "headers": {"Authorization": "Bearer " + token}},
+                total,
+            ),
+            "GET /admin/users/": ({"method": "GET", "url": "/admin/users/", "params": {"records": 100}}, total),
+            "GET /admin/settings/": ({"method": "GET", "url": "/admin/settings/"}, total),
+            "GET /healthcheck/": ({"method": "GET", "url": "/healthcheck/"}, total),
+        }
+        return {name: await drive(client, request, count, concurrency) for name, (request, count) in routes.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load a running server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base url of the server.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per route.")
+    parser.add_argument("--logins", type=int, default=50, help="Requests to the login route, it is slow on purpose.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight.")
+    arguments = parser.parse_args()
+    results = asyncio.run(main(arguments.url, arguments.requests, arguments.concurrency, arguments.logins))
+    print(json.dumps(results, indent=2))  # noqa: T201
@@ -3,9 +3,11 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from api.core.jwt.model import AuthForm, AuthRequest, Token
-from api.core.jwt.utils import authenticate, barear, renew, revoke
+from api.core.database import session
+from api.core.jwt.model import AuthForm, AuthRequest, RefreshRequest, Token
+from api.core.jwt.utils import authenticate, barear, identify, refresh, refresh_factory, renew, revoke
 from api.core.model import SimpleMessage
+from api.users.utils import revoke_all_tokens
 
 router = APIRouter()
 
@@ -73,10 +75,53 @@ def get_validate(token: Annotated[str, Depends(barear)]):
 
 @router.get("/renew", status_code=status.HTTP_200_OK, response_model=Token)
 def get_renew(token: Annotated[str, Depends(barear)]):
-    """Get Renew."""
-    new_token = renew(token=Token(access_token=token))
-    revoke(token=Token(access_token=token))
-    return new_token
+    """
+    Get Renew.
+
+    Replace the access token with a new one, the current one is revoked.
+    Prefer /auth/refresh, it does not write to the revoked tokens store.
+    """
+    return renew(token=Token(access_token=token))
+
+
+@router.post(
+    "/refresh",
+    status_code=status.HTTP_200_OK,
+    response_model=Token,
+    responses={
+        200: {"description": "Successful Response."},
+        401: {"description": "Not authorized: Invalid token."},
+        403: {"description": "Forbidden: Wrong credetials or user is not active, not verified or is blocked."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def post_refresh(request: RefreshRequest) -> Token:
+    """
+    Post Refresh.
+
+    Exchange a refresh token for a new access token and a new refresh token.
+    Each refresh token can be used once, using it again revokes every token of its login.
+    """
+    return refresh(refresh_token=request.refresh_token)
+
+
+@router.post(
+    "/refresh/revoke",
+    status_code=status.HTTP_200_OK,
+    response_model=SimpleMessage,
+    responses={
+        200: {"description": "Successful Response."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def post_refresh_revoke(request: RefreshRequest) -> SimpleMessage:
+    """
+    Post Refresh Revoke.
+
+    Revoke a refresh token, and every refresh token of its login.
+    """
+    refresh_factory.revoke(request.refresh_token)
+    return SimpleMessage(status="Refresh token revoked.")
 
 
 @router.get("/logout", status_code=status.HTTP_200_OK, response_model=SimpleMessage)
@@ -84,3 +129,26 @@ def get_logout(token: Annotated[str, Depends(barear)]):
     """Get Logout."""
     revoke(token=Token(access_token=token))
     return SimpleMessage(status="Logout successful.")
+
+
+@router.post(
+    "/logout/all",
+    status_code=status.HTTP_200_OK,
+    response_model=SimpleMessage,
+    responses={
+        200: {"description": "Successful Response."},
+        401: {"description": "Not authorized: Invalid token."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def post_logout_all(token: Annotated[str, Depends(barear)]) -> SimpleMessage:
+    """
+    Post Logout All.
+
+    Logout from every session, every access and refresh token of the user is invalidated.
+    """
+    user = identify(token=Token(access_token=token))
+    with session() as database_session:
+        revoke_all_tokens(database_session, email=user.email)
+        database_session.commit()
+    return SimpleMessage(status="Logout successful.")
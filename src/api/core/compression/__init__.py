@@ -0,0 +1 @@
+"""Compression Module."""
@@ -0,0 +1,200 @@
+"""Compression Middleware."""
+import zlib
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.core.settings.utils import running_settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+def supported_encodings() -> list[str]:
+    """Return the supported encodings, in order of preference."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Choose a content encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): Accept-Encoding header value.
+
+    Returns:
+        str | None: The chosen encoding, or None if the response must not be compressed.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        token, _, parameters = item.strip().partition(";")
+        weight = 1.0
+        parameter, _, value = parameters.strip().partition("=")
+        if parameter.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        if token:
+            weights[token.strip()] = weight
+    chosen, chosen_weight = None, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > chosen_weight:
+            chosen, chosen_weight = encoding, weight
+    return chosen
+
+
+# Highest level of each encoding, higher levels are clamped to it
+MAX_LEVELS = {"zstd": 22, "br": 11, "gzip": 9}
+
+
+def copy_start(message: Message) -> Message:
+    """Return a copy of a response start message, with its own headers list, that can be changed safely."""
+    return {**message, "headers": [(name, value) for name, value in message["headers"]]}
+
+
+class Compressor:
+    """Incremental compressor for a single response body."""
+
+    def __init__(self, encoding: str, level: int) -> None:
+        """Create the compressor for the encoding, the level is clamped to the range of the encoding."""
+        self.encoding = encoding
+        level = max(1, min(level, MAX_LEVELS.get(encoding, 9)))
+        if encoding == "zstd":
+            self._engine = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "br":
+            self._engine = brotli.Compressor(quality=level)
+        else:
+            self._engine = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk, flushing it so it can be sent right away."""
+        if self.encoding == "br":
+            return bytes(self._engine.process(data) + (self._engine.finish() if final else self._engine.flush()))
+        if self.encoding == "zstd":
+            mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            return bytes(self._engine.compress(data) + self._engine.flush(mode))
+        return bytes(self._engine.compress(data) + self._engine.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH))
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with zstd, brotli or gzip, negotiated with the Accept-Encoding header.
+
+    Responses smaller than api.compression_minimum_size are sent as they are.
+    Responses for the precompressed paths are compressed once, and then served from memory.
+    """
+
+    def __init__(self, app: ASGIApp, precompressed_paths: Iterable[str] = ()) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.precompressed_paths = frozenset(precompressed_paths)
+        self.precompressed: dict[tuple[str, str, int], tuple[Message, bytes]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        settings = running_settings.api
+        cache_key = None
+        if scope["method"] == "GET" and scope["path"] in self.precompressed_paths:
+            cache_key = (scope["path"], encoding, settings.compression_level)
+            if cache_key in self.precompressed:
+                start, body = self.precompressed[cache_key]
+                # Outer middlewares may change the headers, each response gets its own copy
+                await send(copy_start(start))
+                await send({"type": "http.response.body", "body": body})
+                return
+        responder = _CompressionResponder(
+            send=send,
+            compressor=Compressor(encoding, settings.compression_level),
+            minimum_size=settings.compression_minimum_size,
+        )
+        await self.app(scope, receive, responder)
+        if cache_key is not None and responder.cacheable is not None:
+            self.precompressed[cache_key] = responder.cacheable
+
+
+class _CompressionResponder:
+    """Send wrapper that compresses the response body."""
+
+    def __init__(self, send: Send, compressor: Compressor, minimum_size: int) -> None:
+        self.send = send
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.active = False
+        self.passthrough = False
+        self.cacheable: tuple[Message, bytes] | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Wait for the first body chunk, to decide if it is worth compressing.
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or headers.get("content-type", "").startswith(
+                "text/event-stream"
+            )
+            if self.passthrough:
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+        if not self.active and self.start is not None:
+            if not more_body and len(body) < self.minimum_size:
+                await self._flush_start()
+                await self.send(message)
+                return
+            # Start compressing
+            self.active = True
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.compressor.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            if not more_body:
+                compressed = self.compressor.compress(body, final=True)
+                headers["Content-Length"] = str(len(compressed))
+                if self.start["status"] == 200:
+                    self.cacheable = (copy_start(self.start), compressed)
+                await self._flush_start()
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self._flush_start()
+        await self.send(
+            {
+                "type": "http.response.body",
+                "body": self.compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            }
+        )
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
@@ -1,38 +1,72 @@
 """Core Constants."""
+from importlib.metadata import PackageMetadata, PackageNotFoundError, metadata, packages_distributions
 from typing import Any
 
 import toml
 
-from api.core.utils import environment
+from api.core.environment import Environment
+from api.core.responses import FastJSONResponse
+
+
+def _distribution_metadata(package_name: str) -> PackageMetadata:
+    """
+    Return the metadata of the distribution that ships a package.
+
+    The distribution is looked up by the package name first, editable installs are named after it.
+    Only when that fails every installed distribution is scanned, which is slow.
+    """
+    try:
+        return metadata(package_name)
+    except PackageNotFoundError:
+        for distribution in packages_distributions().get(package_name, []):
+            return metadata(distribution)
+        raise
+
+
+def _project_metadata() -> tuple[str, str, str]:
+    """
+    Read the project name, version and repository, only once.
+
+    The metadata baked in the installed package is used, pyproject.toml is only parsed when running from a checkout.
+    """
+    try:
+        package = _distribution_metadata((__package__ or __name__).split(".", maxsplit=1)[0])
+        urls = dict(url.split(", ", 1) for url in package.get_all("Project-URL") or [])
+        return package["Name"], package["Version"], urls.get("Repository", "")
+    except PackageNotFoundError:
+        project = toml.load("pyproject.toml")["tool"]["poetry"]
+        return project["name"], project["version"], project["repository"]
+
 
 # General Constants
-app_name = toml.load("pyproject.toml")["tool"]["poetry"]["name"]
-app_version = toml.load("pyproject.toml")["tool"]["poetry"]["version"]
-app_website = toml.load("pyproject.toml")["tool"]["poetry"]["repository"]
+app_name, app_version, app_website = _project_metadata()
 
 
 # API Initialization parameters
-app_start_parameters: dict[str, Any] = {
-    "title": app_name,
-    "version": app_version,
-    "description": "API for the " + app_name + " application.",
-    "debug": environment.behavior.is_debug,
-    "license_info": {
-        "name": "MIT",
-        "database_connection_url": "https://opensource.org/licenses/MIT",
-    },
-    "contact": {
-        "name": "Bruno Botelho",
-        "database_connection_url": app_website,
-        "email": "bruno.botelho.br@gmail.com",
-    },
-}
-
-if environment.behavior.is_debug is True:
-    app_start_parameters["redoc_url"] = "/redoc"
-    app_start_parameters["openapi_url"] = "/openapi.json"
-    app_start_parameters["docs_url"] = "/"
-else:
-    app_start_parameters["redoc_url"] = None
-    app_start_parameters["openapi_url"] = None
-    app_start_parameters["docs_url"] = None
+def app_start_parameters(environment: Environment) -> dict[str, Any]:
+    """Return the FastAPI initialization parameters for an environment."""
+    parameters: dict[str, Any] = {
+        "title": app_name,
+        "version": app_version,
+        "description": "API for the " + app_name + " application.",
+        "debug": environment.behavior.is_debug,
+        "default_response_class": FastJSONResponse,
+        "license_info": {
+            "name": "MIT",
+            "database_connection_url": "https://opensource.org/licenses/MIT",
+        },
+        "contact": {
+            "name": "Bruno Botelho",
+            "database_connection_url": app_website,
+            "email": "bruno.botelho.br@gmail.com",
+        },
+    }
+    if environment.behavior.is_debug is True:
+        parameters["redoc_url"] = "/redoc"
+        parameters["openapi_url"] = "/openapi.json"
+        parameters["docs_url"] = "/"
+    else:
+        parameters["redoc_url"] = None
+        parameters["openapi_url"] = None
+        parameters["docs_url"] = None
+    return parameters
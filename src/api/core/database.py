@@ -1,58 +1,327 @@
 """Core Database."""
-from sqlalchemy import create_engine, text
+import os
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import sha256
+from http.cookies import SimpleCookie
+from threading import Lock
+from time import monotonic, perf_counter, time
+from typing import Iterator
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection, Engine, create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from api.core.environment import Environment
+from api.core.metrics.utils import current_queries, query_seconds, registry
+from api.core.state import get_state
 from api.core.utils import environment
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
 
 # Create the engine
-def _create_local_engine():
+def _create_local_engine(environment: Environment) -> Engine:  # pylint: disable=redefined-outer-name
     """Create the database engine."""
     # Adjust the engine for sqlite
     if environment.database_connection_url.startswith("sqlite"):
         connect_args = {"check_same_thread": False}
-        return create_engine(
+        engine = create_engine(
             environment.database_connection_url,
             # Echo commandt to stdout, if environment is debug
             echo=environment.behavior.is_debug,
             connect_args=connect_args,
+            query_cache_size=environment.database_compiled_cache_size,
         )
+        if environment.database_sqlite_tuning:
+            _tune_sqlite(engine, environment)
+        return engine
     # Standard engine
     return create_engine(
         environment.database_connection_url,
         # Echo commandt to stdout, if environment is debug
         echo=environment.behavior.is_debug,
+        query_cache_size=environment.database_compiled_cache_size,
     )
 
 
-# Spawn the engine
-engine = _create_local_engine()
-session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _tune_sqlite(engine: Engine, environment: Environment) -> None:  # pylint: disable=redefined-outer-name
+    """
+    Tune a SQLite engine for concurrent use.
+
+    Every connection uses WAL journaling, so readers do not block the writer, with a busy timeout, a page cache
+    and memory mapped reads. Writes are serialized in the process, from the first insert, update or delete of a
+    transaction until it ends, so concurrent requests wait for their turn instead of failing as locked.
+    """
+    in_memory = engine.url.database in (None, "", ":memory:")
+    writer = Lock()
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):  # pylint: disable=unused-argument
+        """Apply the pragmas to a new connection."""
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={environment.database_sqlite_busy_timeout}")
+        cursor.execute(f"PRAGMA cache_size=-{environment.database_sqlite_cache_size}")
+        cursor.execute(f"PRAGMA mmap_size={environment.database_sqlite_mmap_size}")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _wait_for_writer(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=R0913
+        """Take the writer turn, on the first write of a transaction."""
+        if context is None or "writer" in conn.info:
+            return
+        if context.isinsert or context.isupdate or context.isdelete:
+            # On timeout, go on and let the SQLite busy timeout decide.
+            if writer.acquire(timeout=environment.database_sqlite_busy_timeout / 1000):
+                conn.info["writer"] = writer
+
+    def _release_writer(conn) -> None:
+        """Give the writer turn back, when the transaction ends."""
+        held = conn.info.pop("writer", None)
+        if held is not None:
+            held.release()
+
+    event.listen(engine, "commit", _release_writer)
+    event.listen(engine, "rollback", _release_writer)
+
+    @event.listens_for(engine.pool, "reset")
+    def _release_on_reset(dbapi_connection, connection_record, reset_state):  # pylint: disable=unused-argument
+        """Give the writer turn back, if a connection returns to the pool inside a transaction."""
+        held = connection_record.info.pop("writer", None)
+        if held is not None:
+            held.release()
+
+
+# Spawn the engine of the current application on first use, not at import time
+def get_engine() -> Engine:
+    """Return the database engine of the current application, creating it on the first call."""
+    state = get_state()
+    if state.engine is None:
+        with state.lock:
+            if state.engine is None:
+                state.engine = _create_local_engine(state.environment)
+    return state.engine
+
+
+def get_replicas() -> list[Engine]:
+    """Return the read replica engines of the current application, creating them on the first call."""
+    state = get_state()
+    if state.replicas is None:
+        with state.lock:
+            if state.replicas is None:
+                state.replicas = [
+                    _create_local_engine(state.environment.model_copy(update={"database_connection_url": url}))
+                    for url in state.environment.database_replica_urls
+                ]
+    return state.replicas
+
+
+# Time until the reads of the current client go to the primary, the time of its last write plus the sticky seconds.
+primary_reads_until: ContextVar[list[float] | None] = ContextVar("primary_reads_until", default=None)
+
+
+def get_read_engine() -> Engine:
+    """
+    Return the engine for read only work.
+
+    Replicas are used in round robin, skipping the failing ones.
+    The primary is used if there are no healthy replicas, or after a write of the client, so it reads its own writes.
+    """
+    state = get_state()
+    replicas = get_replicas()
+    until = primary_reads_until.get()
+    if not replicas or (until is not None and time() < until[0]):
+        return get_engine()
+    now = monotonic()
+    for _ in replicas:
+        index = next(state.replica_cursor) % len(replicas)
+        if state.replicas_down.get(index, 0.0) <= now:
+            return replicas[index]
+    return get_engine()
+
+
+session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+@event.listens_for(Engine, "handle_error")
+def _replica_failed(context) -> None:
+    """Leave a replica out for a while, if it failed to connect or lost the connection."""
+    state = get_state()
+    if state.replicas and context.engine in state.replicas and (context.is_disconnect or context.connection is None):
+        state.replicas_down[state.replicas.index(context.engine)] = (
+            monotonic() + state.environment.database_replica_retry
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=too-many-arguments
+    """Record when a query started."""
+    if registry.enabled or current_queries.get() is not None:
+        conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=too-many-arguments
+    """Record the time taken by a query, for the metrics and for the current request."""
+    if conn.info.get("query_started"):
+        elapsed = perf_counter() - conn.info["query_started"].pop()
+        query_seconds.observe(elapsed)
+        queries = current_queries.get()
+        if queries is not None:
+            queries.append(elapsed)
+    # Send the next reads of the client to the primary
+    until = primary_reads_until.get()
+    if until is not None and context is not None and (context.isinsert or context.isupdate or context.isdelete):
+        until[0] = time() + get_state().environment.database_sticky_seconds
+
+
+class StickyReadsMiddleware:
+    """
+    Send the reads of a client to the primary for a while after its writes, so it reads its own writes.
+
+    The time is kept on a cookie, so the client is sticky on every worker, and others keep reading from replicas.
+    """
+
+    cookie = "api_primary_until"
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap the application."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        received = self.received(Headers(scope=scope).get("cookie", ""))
+        until = [received]
+
+        async def send_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and until[0] > received:
+                max_age = max(1, round(until[0] - time()))
+                MutableHeaders(scope=message).append(
+                    "set-cookie", f"{self.cookie}={until[0]:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        token = primary_reads_until.set(until)
+        try:
+            await self.app(scope, receive, send_cookie)
+        finally:
+            primary_reads_until.reset(token)
+
+    @classmethod
+    def received(cls, header: str) -> float:
+        """Return the time until reads go to the primary, sent on the cookie, or 0."""
+        morsel = SimpleCookie(header).get(cls.cookie)
+        try:
+            return float(morsel.value) if morsel is not None else 0.0
+        except ValueError:
+            return 0.0
+
+
+def session() -> Session:
+    """Return a new database session."""
+    return session_factory(bind=get_engine())
+
+
+def read_session() -> Session:
+    """Return a new database session for read only work, on a replica if there is one."""
+    return session_factory(bind=get_read_engine())
+
 
 # Create the base model, if environment.aut_create_models is True
 if environment.aut_create_models:
     BaseModelORM = declarative_base()
 
 
+# Revision of the schema created by create_all, before migrations
+BASELINE_REVISION = "0001"
+# Advisory lock held while migrating a PostgreSQL database
+MIGRATIONS_LOCK_KEY = 20261019
+
+
+def _migrations_config(connection: Connection) -> Config:
+    """Return the migrations configuration, running on the connection."""
+    config = Config()
+    config.set_main_option("script_location", "api:migrations")
+    config.attributes["connection"] = connection
+    return config
+
+
+@contextmanager
+def _migration_lock(engine: Engine) -> Iterator[None]:
+    """
+    Hold the migrations lock of a database, so only one process upgrades its schema at a time.
+
+    Every worker migrates on startup, the ones on the same host wait for each other on a lock file.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    name = sha256(engine.url.render_as_string(hide_password=False).encode()).hexdigest()[:16]
+    descriptor = os.open(os.path.join(tempfile.gettempdir(), f"api-migrations-{name}.lock"), os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(descriptor)
+
+
+def migrate(revision: str = "head") -> bool:
+    """
+    Upgrade the database schema to a revision.
+
+    Databases created by create_all, before migrations, are stamped with the baseline revision first.
+    Concurrent calls wait for each other, on PostgreSQL with an advisory lock, so workers on other hosts do too.
+    """
+    engine = get_engine()
+    with _migration_lock(engine), engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+        config = _migrations_config(connection)
+        tables = inspect(connection).get_table_names()
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+    return True
+
+
 def reset() -> bool:
     """Reset the database."""
-    BaseModelORM.metadata.drop_all(bind=engine)
-    BaseModelORM.metadata.create_all(bind=engine)
-    return True
+    BaseModelORM.metadata.drop_all(bind=get_engine())
+    with get_engine().begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    return migrate()
 
 
 def shutdown() -> bool:
     """Shutdown the database."""
-    engine.dispose()
+    state = get_state()
+    if state.engine is not None:
+        state.engine.dispose()
+        state.engine = None
+    for replica in state.replicas or []:
+        replica.dispose()
+    state.replicas = None
     return True
 
 
 def initialize() -> bool:
     """Initialize the database."""
     if environment.aut_create_models:
-        BaseModelORM.metadata.create_all(bind=engine)
-        return True
+        return migrate()
     return False
 
 
@@ -75,3 +344,12 @@ def get_database_session():
         yield database_session
     finally:
         database_session.close()
+
+
+def get_read_database_session():
+    """Return a database session for read only work."""
+    try:
+        database_session = read_session()
+        yield database_session
+    finally:
+        database_session.close()
@@ -1,10 +1,10 @@
 """General API dependencies."""
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Query
 from sqlalchemy.orm import Session
 
-from api.core.database import get_database_session
+from api.core.database import get_database_session, get_read_database_session
 from api.core.jwt.utils import get_current_user
 from api.core.paginator.model import QueryBase
 from api.core.settings.model import RunningSettings
@@ -14,8 +14,9 @@ from api.users.model import UserBase
 
 # API Dependencies
 Database = Annotated[Session, Depends(get_database_session)]
+ReadDatabase = Annotated[Session, Depends(get_read_database_session)]
 Settings = Annotated[RunningSettings, Depends(get_running_settings)]
-QueryParameters = Annotated[QueryBase, Depends()]
+QueryParameters = Annotated[QueryBase, Query()]
 HashManager = Annotated[HashHandler, Depends(get_hash_handler)]
 Generator = Annotated[RandomGenerator, Depends(get_generator)]
 Authenticate = Annotated[UserBase, Depends(get_current_user)]
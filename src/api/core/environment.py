@@ -1,10 +1,10 @@
 """Core Environment."""
 from enum import Enum
+from typing import Annotated, Literal
 from uuid import uuid4
 
-from pydantic import BaseSettings, Field
-
-from api.core.model import Singleton
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Behavior(str, Enum):
@@ -31,12 +31,12 @@ class Behavior(str, Enum):
         return self in (self.STAGING, self.PRODUCTION)
 
 
-class DatabaseEnvironment(BaseSettings, Singleton):
+class DatabaseEnvironment(BaseSettings):
     """Class to store the configuration of the database, it loads the environment variables with a prefix."""
 
     database_lazzy_loader: bool = Field(
         default=True,
-        env="API_DB_LAZZY_LOADER",
+        validation_alias="API_DB_LAZZY_LOADER",
         title="Database lazzy loader",
         description=(
             "If True, the database will use the lazzy loader, "
@@ -47,52 +47,220 @@ class DatabaseEnvironment(BaseSettings, Singleton):
     )
     database_connection_url: str = Field(
         default="sqlite:///database.db",
-        env="API_DB_CONNECTION_URL",
+        validation_alias="API_DB_CONNECTION_URL",
         title="Database connection url",
         description="The connection url of the database.",
     )
     aut_create_models: bool = Field(
         default=True,
-        env="API_DB_AUT_CREATE_MODELS",
+        validation_alias="API_DB_AUT_CREATE_MODELS",
         title="Aut create models",
-        description="If True, the models will be created automatically.",
+        description="If True, the database schema is upgraded with the migrations on startup.",
+    )
+    database_compiled_cache_size: int = Field(
+        default=500,
+        ge=0,
+        validation_alias="API_DB_COMPILED_CACHE_SIZE",
+        title="Database compiled cache size",
+        description="Number of compiled SQL statements each engine keeps for reuse, 0 disables the cache.",
+    )
+    database_sqlite_tuning: bool = Field(
+        default=True,
+        validation_alias="API_DB_SQLITE_TUNING",
+        title="Database SQLite tuning",
+        description="If True, SQLite uses WAL journaling and the tuning below, and writes are serialized.",
+    )
+    database_sqlite_busy_timeout: int = Field(
+        default=5000,
+        ge=0,
+        validation_alias="API_DB_SQLITE_BUSY_TIMEOUT",
+        title="Database SQLite busy timeout",
+        description="Milliseconds a connection waits for a lock, before failing as locked.",
+    )
+    database_sqlite_cache_size: int = Field(
+        default=65536,
+        ge=0,
+        validation_alias="API_DB_SQLITE_CACHE_SIZE",
+        title="Database SQLite cache size",
+        description="Page cache of each connection, in KiB.",
+    )
+    database_sqlite_mmap_size: int = Field(
+        default=268435456,
+        ge=0,
+        validation_alias="API_DB_SQLITE_MMAP_SIZE",
+        title="Database SQLite mmap size",
+        description="Bytes of the database file read through memory mapping, 0 disables it.",
+    )
+    database_replica_urls: Annotated[list[str], NoDecode] = Field(
+        default=[],
+        validation_alias="API_DB_REPLICA_URLS",
+        title="Database replica urls",
+        description="Connection urls of the read replicas, separated by commas, read only work is spread over them.",
+    )
+    database_replica_retry: float = Field(
+        default=30,
+        ge=0,
+        validation_alias="API_DB_REPLICA_RETRY",
+        title="Database replica retry",
+        description="Seconds a failing replica is left out, before it is tried again.",
+    )
+    database_sticky_seconds: float = Field(
+        default=5,
+        ge=0,
+        validation_alias="API_DB_STICKY_SECONDS",
+        title="Database sticky seconds",
+        description="Seconds the reads of a client go to the primary after it writes, to cover the replication lag.",
     )
 
-    class Config:
-        """Load environment variables with a prefix and make them case sensitive."""
+    @field_validator("database_replica_urls", mode="before")
+    @classmethod
+    def split_replica_urls(cls, value):
+        """Split the replica urls, if given as a comma separated string."""
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    # Load environment variables with a prefix and make them case insensitive.
+    model_config = SettingsConfigDict(env_prefix="API_DB_", case_sensitive=False, populate_by_name=True)
+
+
+class ServerEnvironment(BaseSettings):
+    """Class to store the configuration of the production server, it loads the environment variables with a prefix."""
+
+    server_host: str = Field(
+        default="127.0.0.1",
+        validation_alias="API_SERVER_HOST",
+        title="Server host",
+        description="The address the server binds to, use 0.0.0.0 inside containers.",
+    )
+    server_port: int = Field(
+        default=8000,
+        validation_alias="API_SERVER_PORT",
+        title="Server port",
+        description="The port the server binds to.",
+    )
+    server_workers: int = Field(
+        default=1,
+        ge=1,
+        validation_alias="API_SERVER_WORKERS",
+        title="Server workers",
+        description=(
+            "Number of worker processes. The memory revoked tokens store, the cached token generations and the metrics"
+            " are kept by each worker, use the database store and scrape every worker before raising it."
+        ),
+    )
+    server_loop: Literal["auto", "asyncio", "uvloop"] = Field(
+        default="auto",
+        validation_alias="API_SERVER_LOOP",
+        title="Server event loop",
+        description="The event loop, auto uses uvloop if it is installed.",
+    )
+    server_http: Literal["auto", "h11", "httptools"] = Field(
+        default="auto",
+        validation_alias="API_SERVER_HTTP",
+        title="Server HTTP parser",
+        description="The HTTP parser, auto uses httptools if it is installed.",
+    )
+    server_backlog: int = Field(
+        default=2048,
+        ge=1,
+        validation_alias="API_SERVER_BACKLOG",
+        title="Server backlog",
+        description="Maximum number of connections waiting to be accepted.",
+    )
+    server_keep_alive: int = Field(
+        default=5,
+        ge=0,
+        validation_alias="API_SERVER_KEEP_ALIVE",
+        title="Server keep alive",
+        description="Seconds an idle connection is kept open, keep it above the load balancer idle timeout.",
+    )
+    server_graceful_shutdown: int = Field(
+        default=30,
+        ge=0,
+        validation_alias="API_SERVER_GRACEFUL_SHUTDOWN",
+        title="Server graceful shutdown",
+        description="Seconds given to the requests in flight to finish when the server is stopping.",
+    )
 
-        env_prefix = "API_DB_"
-        case_sensitive = False
+    # Load environment variables with a prefix and make them case insensitive.
+    model_config = SettingsConfigDict(env_prefix="API_SERVER_", case_sensitive=False, populate_by_name=True)
 
 
-class RunnigeEnviroment(BaseSettings, Singleton):
+class RunnigeEnviroment(BaseSettings):
     """Class to store the enviroment of the API."""
 
     behavior: Behavior = Field(
         default=Behavior.LOCAL,
-        env="API_BEHAVIOR",
+        validation_alias="API_BEHAVIOR",
         title="API behavior",
         description="The behavior of the API, it can be: LOCAL, STAGING, TESTING or PRODUCTION.",
     )
     jwt_key: str = Field(
         default=str(uuid4()),
-        env="API_JWT_KEY",
+        validation_alias="API_JWT_KEY",
         title="JWT key",
         description="The key used to encrypt the JWT, if not provided, a random key will be generated.",
     )
+    json_renderer: Literal["orjson", "json"] = Field(
+        default="orjson",
+        validation_alias="API_JSON_RENDERER",
+        title="JSON renderer",
+        description="The library used to render JSON responses, it can be: orjson or json.",
+    )
+    metrics_enabled: bool = Field(
+        default=True,
+        validation_alias="API_METRICS_ENABLED",
+        title="Metrics enabled",
+        description="If True, metrics are recorded and exposed on /metrics, if False, instrumentation is skipped.",
+    )
+    profiler_enabled: bool = Field(
+        default=False,
+        validation_alias="API_PROFILER_ENABLED",
+        title="Profiler enabled",
+        description=(
+            "If True, the sampling profiler is exposed on /admin/profiler and with the X-Profile header, "
+            + "it is always exposed if the behavior is debug."
+        ),
+    )
+    query_budget: int | None = Field(
+        default=20,
+        ge=0,
+        validation_alias="API_QUERY_BUDGET",
+        title="Query budget",
+        description=(
+            "Maximum database queries of a request, requests running more are logged, "
+            + "or fail if the behavior is TESTING, if not provided, no budget is applied."
+        ),
+    )
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = Field(
+        default="INFO",
+        validation_alias="API_LOG_LEVEL",
+        title="Log level",
+        description="Minimum level of the JSON logs written to stdout.",
+    )
+    log_sample_rate: float = Field(
+        default=0.01,
+        ge=0,
+        le=1,
+        validation_alias="API_LOG_SAMPLE_RATE",
+        title="Log sample rate",
+        description="Fraction of the requests to high volume routes, like healthchecks and metrics, that are logged.",
+    )
+    warmup_connections: int = Field(
+        default=5,
+        ge=0,
+        validation_alias="API_WARMUP_CONNECTIONS",
+        title="Warmup connections",
+        description="Database connections opened while warming up, it must not be greater than the pool size.",
+    )
 
-    class Config:
-        """Load environment variables with a prefix and make them case sensitive."""
-
-        env_prefix = "API_"
-        case_sensitive = False
+    # Load environment variables with a prefix and make them case insensitive.
+    model_config = SettingsConfigDict(env_prefix="API_", case_sensitive=False, populate_by_name=True)
 
 
-class Environment(DatabaseEnvironment, RunnigeEnviroment, Singleton):
+class Environment(DatabaseEnvironment, ServerEnvironment, RunnigeEnviroment):
     """Class to store the configuration of the API."""
 
-    class Config:
-        """Load environment variables with a prefix and make them case sensitive."""
-
-        env_prefix = "API_"
-        case_sensitive = False
+    # Load environment variables with a prefix and make them case insensitive.
+    model_config = SettingsConfigDict(env_prefix="API_", case_sensitive=False, populate_by_name=True)
@@ -1,13 +1,15 @@
 """Healthcheck router."""
 from datetime import datetime
 
-import toml
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import inspect
 from sqlalchemy.sql import text
 
-from api.core.database import engine, session
+from api.core.constants import app_name, app_version
+from api.core.database import get_engine, session
 from api.core.healthcheck.schema import Entity, HealthCheck
+from api.core.model import SimpleMessage
+from api.core.state import get_state
 
 router = APIRouter()
 
@@ -33,7 +35,7 @@ def simple_healthcheck() -> HealthCheck:
         database_query = text("SELECT 1")
         dabase_session.execute(database_query)
         # Count Tables
-        ispn = inspect(engine)
+        ispn = inspect(get_engine())
         database_details: dict[str, str] = {}
         database_details["flavor"] = str(ispn.engine.name)
         database_details["dialect"] = str(ispn.engine.dialect.name)
@@ -50,8 +52,8 @@ def simple_healthcheck() -> HealthCheck:
     # Consolidate
     start = datetime.now()
     api_details: dict[str, str] = {}  # type: ignore
-    api_details["name"] = toml.load("pyproject.toml")["tool"]["poetry"]["name"]
-    api_details["version"] = toml.load("pyproject.toml")["tool"]["poetry"]["version"]
+    api_details["name"] = app_name
+    api_details["version"] = app_version
 
     # Adjust the status
     main_status = "ok"
@@ -65,3 +67,23 @@ def simple_healthcheck() -> HealthCheck:
         details=api_details,
         entities=[dbe],
     )
+
+
+@router.get(
+    "/ready",
+    response_model=SimpleMessage,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Ready"},
+        503: {"description": "Service Unavailable"},
+    },
+)
+def readiness() -> SimpleMessage:
+    """
+    Get Readiness.
+
+    Report if the application finished warming up, for load balancers.
+    """
+    if not get_state().ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service Unavailable: Warming up.")
+    return SimpleMessage(status="Ready.")
@@ -1,38 +1,47 @@
 """JWT Schema."""
+import secrets
 from datetime import datetime, timedelta
+from hashlib import sha256
+from typing import Any
 
 from fastapi import Form, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from pydantic import BaseModel, Field
 
-from api.core.database import session
-from api.core.jwt.orm import RevokedTokenORM
+from api.core.database import read_session, session
+from api.core.jwt.orm import (
+    RefreshTokenORM,
+    RevokedTokenORM,
+    expired_refresh_tokens,
+    expired_tokens,
+    refresh_token_by_hash,
+    revoke_refresh_family,
+    revoked_token,
+    use_refresh_token,
+)
+from api.core.logs.utils import audit_logger
+from api.core.metrics.utils import revoked_lookups, token_verify_seconds
 from api.core.model import Singleton
-from api.core.settings.utils import running_settings
+from api.core.settings.utils import as_utc, running_settings
+from api.core.state import get_state
 from api.core.utils import environment
 
-# To fix!
-bad_tokens = []
-
 
 class Token(BaseModel):
     """JWT Token Model."""
 
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
 
 
-class RevokedToken(BaseModel):
-    """JWT Token Revoked Model."""
-
-    token: str
-    expiration: datetime
-
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
+class RefreshRequest(BaseModel):
+    """Refresh Request Model."""
 
-        orm_mode = True
+    refresh_token: str = Field(
+        title="Refresh token", description="Refresh token returned by the last login or refresh."
+    )
 
 
 class JWTFactory(BaseModel, Singleton):
@@ -53,33 +62,56 @@ class JWTFactory(BaseModel, Singleton):
             ) from error
         return data
 
-    def check_revoked(self, token: str) -> bool:
-        """Check if token is revoked."""
-        data = self.parce(token)
-        revoked = RevokedToken(token=token, expiration=datetime.utcfromtimestamp(data["exp"]))
+    @staticmethod
+    def token_id(token: str, data: dict) -> bytes:
+        """
+        Return the 128 bit id of a token, from its jti claim.
+
+        Tokens minted without a jti are identified by the first 128 bits of their SHA-256 digest.
+        """
+        jti = data.get("jti")
+        if isinstance(jti, str) and len(jti) == 32:
+            try:
+                return bytes.fromhex(jti)
+            except ValueError:
+                pass
+        return sha256(token.encode()).digest()[:16]
+
+    def check_revoked(self, token: str, data: dict | None = None) -> bool:
+        """Check if token is revoked, data is the payload if the token was already parced."""
+        if data is None:
+            data = self.parce(token)
+        token_id = self.token_id(token, data)
         if running_settings.jwt.jwt_revokes_store == "memory":
-            if revoked in bad_tokens:
+            if token_id in get_state().revoked_tokens:
+                revoked_lookups.inc("memory", "hit")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Not authorized: Invalid token.",
                 )
+            revoked_lookups.inc("memory", "miss")
         if running_settings.jwt.jwt_revokes_store == "database":
-            with session() as database_session:
-                if database_session.query(RevokedTokenORM).filter(RevokedTokenORM.token == token).first():
+            with read_session() as database_session:
+                if database_session.execute(revoked_token, {"jti": token_id}).first():
+                    revoked_lookups.inc("database", "hit")
                     raise HTTPException(
                         status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="Not authorized: Invalid token.",
                     )
+                revoked_lookups.inc("database", "miss")
         if running_settings.jwt.jwt_revokes_store == "cache":
             raise NotImplementedError
         return True
 
-    def create(self, email: str) -> str:
-        """Generate JWT."""
+    def create(self, email: str, generation: int = 0, **claims: Any) -> str:
+        """Generate JWT, for the token generation of the user, with extra claims."""
         return str(
             jwt.encode(
                 {
+                    **claims,
                     "sub": email,
+                    "jti": secrets.token_hex(16),
+                    "gen": generation,
                     "iat": datetime.utcnow(),
                     "exp": datetime.utcnow() + timedelta(minutes=running_settings.jwt.jwt_expiration_initial),
                 },
@@ -89,7 +121,12 @@ class JWTFactory(BaseModel, Singleton):
         )
 
     def verify(self, token: str) -> str:
-        """Verify JWT."""
+        """Verify JWT, and return its subject."""
+        return str(self.verify_claims(token)["sub"])
+
+    @token_verify_seconds.time()
+    def verify_claims(self, token: str) -> dict[str, Any]:
+        """Verify JWT, and return its claims."""
         # Is it a Valit Token?
         data = self.parce(token)
         # Is it expired?
@@ -111,8 +148,8 @@ class JWTFactory(BaseModel, Singleton):
                 detail="Not authorized: Invalid token.",
             )
         # Is ir revoked?
-        self.check_revoked(token)
-        return str(data["sub"])
+        self.check_revoked(token, data)
+        return dict(data)
 
     def revoke(self, token: str) -> bool:
         """Revoke JWT."""
@@ -122,19 +159,38 @@ class JWTFactory(BaseModel, Singleton):
             # Is it a Valit Tokern?
         data = self.parce(token)
         # Add to bad tokens
-        revoked = RevokedToken(token=token, expiration=datetime.utcfromtimestamp(data["exp"]))
-        if self.check_revoked(token):
+        token_id = self.token_id(token, data)
+        expiration = datetime.utcfromtimestamp(data["exp"])
+        if self.check_revoked(token, data):
             if running_settings.jwt.jwt_revokes_store == "memory":
-                bad_tokens.append(revoked)
+                get_state().revoked_tokens[token_id] = expiration
             if running_settings.jwt.jwt_revokes_store == "database":
                 with session() as database_session:
-                    if database_session.query(RevokedTokenORM).filter(RevokedTokenORM.token == token).first() is None:
-                        database_session.add(revoked)
+                    if database_session.execute(revoked_token, {"jti": token_id}).first() is None:
+                        database_session.add(RevokedTokenORM(jti=token_id, expiration=expiration))
                         database_session.commit()
             if running_settings.jwt.jwt_revokes_store == "cache":
                 raise NotImplementedError
+            audit_logger.info(
+                "Token revoked.", extra={"event": "revoke", "subject": data["sub"], "expiration": expiration}
+            )
         return True
 
+    def purge(self) -> int:
+        """Remove the expired tokens from the revoked tokens, and return how many were removed."""
+        now = datetime.utcnow()
+        state = get_state()
+        expired = [token_id for token_id, expiration in list(state.revoked_tokens.items()) if expiration < now]
+        for token_id in expired:
+            state.revoked_tokens.pop(token_id, None)
+        purged = len(expired)
+        with session() as database_session:
+            purged += database_session.execute(
+                expired_tokens, {"now": now}, execution_options={"synchronize_session": False}
+            ).rowcount
+            database_session.commit()
+        return purged
+
     def renew(self, token: str) -> str:
         """Renew JWT."""
         # Fix Format
@@ -150,9 +206,9 @@ class JWTFactory(BaseModel, Singleton):
         return str(
             jwt.encode(
                 {
-                    "sub": data["sub"],
-                    "iat": data["iat"],
-                    "exp": new_expiration.utcnow(),
+                    **data,
+                    "jti": secrets.token_hex(16),
+                    "exp": new_expiration,
                 },
                 key=environment.jwt_key,
                 algorithm=running_settings.jwt.jwt_algorithm,
@@ -160,24 +216,126 @@ class JWTFactory(BaseModel, Singleton):
         )
 
 
+class RefreshTokenFactory(BaseModel, Singleton):
+    """
+    Refresh Token Factory.
+
+    Refresh tokens are opaque random strings, only their hash is stored.
+    Each one can be used once, and is replaced by a new one of the same family.
+    If a used token comes back, it was likely stolen, and the whole family is revoked.
+    """
+
+    @staticmethod
+    def hash(token: str) -> str:
+        """Return the hash of a refresh token, tokens are random enough for a fast hash."""
+        return sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def new_family() -> str:
+        """Return a new family id, one for each login, access tokens carry it as their session id."""
+        return secrets.token_hex(16)
+
+    def create(self, subject: str, generation: int = 0, family: str | None = None, database_session=None) -> str:
+        """Generate a refresh token, for the token generation of the user, in a new family unless one is given."""
+        token = secrets.token_urlsafe(32)
+        stored = RefreshTokenORM(
+            token_hash=self.hash(token),
+            family=family or self.new_family(),
+            subject=subject,
+            generation=generation,
+            expiration=datetime.utcnow() + timedelta(minutes=running_settings.jwt.jwt_refresh_expiration),
+            used=False,
+        )
+        if database_session is not None:
+            database_session.add(stored)
+            return token
+        with session() as new_session:
+            new_session.add(stored)
+            new_session.commit()
+        return token
+
+    def rotate(self, token: str) -> tuple[str, int, str, str]:
+        """
+        Use a refresh token, and return the refresh token replacing it.
+
+        Returns:
+            tuple[str, int, str, str]: Subject, token generation, family and the new refresh token.
+        """
+        token_hash = self.hash(token)
+        with session() as database_session:
+            stored = database_session.execute(refresh_token_by_hash, {"refresh_hash": token_hash}).scalar_one_or_none()
+            # PostgreSQL returns the expiration timezone aware, SQLite naive
+            if stored is None or as_utc(stored.expiration) < datetime.utcnow():
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Not authorized: Invalid token.",
+                )
+            subject, generation, family = str(stored.subject), int(stored.generation), str(stored.family)
+            # Used before, or by a concurrent request right now
+            if stored.used or not database_session.execute(use_refresh_token, {"refresh_hash": token_hash}).rowcount:
+                database_session.execute(revoke_refresh_family, {"family": family})
+                database_session.commit()
+                audit_logger.warning(
+                    "Refresh token reused, its family was revoked.",
+                    extra={"event": "refresh", "result": "reuse", "subject": subject},
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Not authorized: Invalid token.",
+                )
+            new_token = self.create(subject, generation, family=family, database_session=database_session)
+            database_session.commit()
+        return subject, generation, family, new_token
+
+    def revoke(self, token: str) -> bool:
+        """Revoke a refresh token, with its whole family."""
+        with session() as database_session:
+            stored = database_session.execute(
+                refresh_token_by_hash, {"refresh_hash": self.hash(token)}
+            ).scalar_one_or_none()
+            if stored is None:
+                return False
+            subject = str(stored.subject)
+            database_session.execute(revoke_refresh_family, {"family": stored.family})
+            database_session.commit()
+        audit_logger.info("Refresh token revoked.", extra={"event": "revoke", "subject": subject})
+        return True
+
+    def revoke_family(self, family: str) -> bool:
+        """Revoke every refresh token of a family, the ones of a login, and return True if there was any."""
+        with session() as database_session:
+            revoked = database_session.execute(revoke_refresh_family, {"family": family}).rowcount
+            database_session.commit()
+        return bool(revoked)
+
+    def purge(self) -> int:
+        """Remove the expired refresh tokens, and return how many were removed."""
+        with session() as database_session:
+            purged = database_session.execute(
+                expired_refresh_tokens, {"now": datetime.utcnow()}, execution_options={"synchronize_session": False}
+            ).rowcount
+            database_session.commit()
+        return int(purged)
+
+
 class AuthRequest(BaseModel):
     """Auth Request Model."""
 
     username: str = Field(
         title="Username or Email",
         description="Username or Email, depending on the configuration.",
-        example="john.doe@example.com",
+        examples=["john.doe@example.com"],
     )
-    password: str = Field(title="Password", description="Password.", example="P@ssw0rd")
+    password: str = Field(title="Password", description="Password.", examples=["P@ssw0rd"])
 
 
 class AuthForm(OAuth2PasswordRequestForm):
     """Auth Form Model."""
 
-    grant_type: str = Form(default="password", regex="password")
+    grant_type: str = Form(default="password", pattern="password")
     username: str = Form(
         title="Username or Email",
         description="Username or Email, depending on the configuration.",
-        example="john.doe@example.com",
+        examples=["john.doe@example.com"],
     )
-    password: str = Form(title="Password", description="Password.", example="P@ssw0rd")
+    password: str = Form(title="Password", description="Password.", examples=["P@ssw0rd"])
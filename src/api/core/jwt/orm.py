@@ -1,14 +1,47 @@
 """JWT ORM."""
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Integer, LargeBinary, String, bindparam, delete, select, update
 
 from api.core.database import BaseModelORM
 
 
 class RevokedTokenORM(BaseModelORM):
-    """JWT Token Revoked Model."""
+    """JWT Token Revoked Model, keyed by the 128 bit id of the token."""
 
     __tablename__ = "revokedtokens"
     __table_args__ = {"extend_existing": True}
 
-    token = Column(String(60), index=True, primary_key=True)
-    expiration = Column(DateTime(timezone=True))
+    jti = Column(LargeBinary(16), primary_key=True)
+    expiration = Column(DateTime(timezone=True), index=True)
+
+
+class RefreshTokenORM(BaseModelORM):
+    """
+    Refresh Token Model.
+
+    Only the hash of the token is stored. Tokens rotated from the same login share a family,
+    a used token is kept until it expires, to detect if it is used again.
+    """
+
+    __tablename__ = "refreshtokens"
+
+    token_hash = Column(String(64), primary_key=True)
+    family = Column(String(64), nullable=False, index=True)
+    subject = Column(String(256), nullable=False)
+    generation = Column(Integer, nullable=False, default=0)
+    expiration = Column(DateTime(timezone=True), nullable=False, index=True)
+    used = Column(Boolean, nullable=False, default=False)
+
+
+# Hot lookups, built once so each execution only binds the parameters and reuses the compiled statement.
+revoked_token = select(RevokedTokenORM.jti).where(RevokedTokenORM.jti == bindparam("jti"))
+expired_tokens = delete(RevokedTokenORM).where(RevokedTokenORM.expiration < bindparam("now"))
+refresh_token_by_hash = select(RefreshTokenORM).where(RefreshTokenORM.token_hash == bindparam("refresh_hash"))
+# Mark a refresh token as used, only if nobody used it meanwhile.
+use_refresh_token = (
+    update(RefreshTokenORM)
+    .where(RefreshTokenORM.token_hash == bindparam("refresh_hash"), RefreshTokenORM.used.is_(False))
+    .values(used=True)
+    .execution_options(synchronize_session=False)
+)
+revoke_refresh_family = delete(RefreshTokenORM).where(RefreshTokenORM.family == bindparam("family"))
+expired_refresh_tokens = delete(RefreshTokenORM).where(RefreshTokenORM.expiration < bindparam("now"))
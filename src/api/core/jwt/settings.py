@@ -1,9 +1,7 @@
 """JWT settings."""
 from typing import Literal
 
-from pydantic import BaseModel, Field, root_validator
-
-from api.core.model import Singleton
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class JWTSettings(BaseModel):
@@ -12,8 +10,8 @@ class JWTSettings(BaseModel):
     jwt_algorithm: str = Field(title="JWT algorithm", description="JWT algorithm", default="HS256")
     jwt_expiration_initial: int = Field(
         title="JWT initial expiration in minutes",
-        description="Initial duration for a JWT",
-        default=30,
+        description="Initial duration for a JWT, keep it short and renew it with a refresh token",
+        default=15,
     )
     jwt_expiration_step: int = Field(
         title="JWT increment in minutes",
@@ -25,6 +23,19 @@ class JWTSettings(BaseModel):
         description="JWT max expiration in minutes",
         default=120,
     )
+    jwt_refresh_expiration: int = Field(
+        title="Refresh token expiration in minutes",
+        description="Duration of a refresh token, each use replaces it with a new one of the same duration.",
+        default=10080,
+    )
+    jwt_generation_cache_seconds: int = Field(
+        title="Token generation cache in seconds",
+        description=(
+            "How long the token generation of a user is cached, before it is read again from the database."
+            " Each worker has its own cache, a logout or a block reaches the other workers only after it expires."
+        ),
+        default=5,
+    )
     jwt_revokes_store: Literal["memory", "cache", "database"] = Field(
         title="JWT revoked store", description="JWT revoked store", default="memory"
     )
@@ -34,26 +45,28 @@ class JWTSettings(BaseModel):
         default=5,
     )
 
-    @root_validator
-    def jwt_expiration_validator(cls, values):  # pylint: disable=E0213
+    @model_validator(mode="after")
+    def jwt_expiration_validator(self):
         """Validate JWT expiration."""
-        if values["jwt_expiration_initial"] < 1:
+        if self.jwt_expiration_initial < 1:
             raise ValueError("JWT expiration initial must be greater than 0.")
-        if values["jwt_expiration_step"] < 0:
+        if self.jwt_expiration_step < 0:
             raise ValueError("JWT expiration step must be greater than or equal to 0.")
-        if values["jwt_expiration_max"] < 1:
+        if self.jwt_refresh_expiration < 1:
+            raise ValueError("JWT refresh expiration must be greater than 0.")
+        if self.jwt_generation_cache_seconds < 0:
+            raise ValueError("JWT generation cache seconds must be greater than or equal to 0.")
+        if self.jwt_expiration_max < 1:
             raise ValueError("JWT expiration max must be greater than 0.")
-        if values["jwt_expiration_initial"] > values["jwt_expiration_max"]:
+        if self.jwt_expiration_initial > self.jwt_expiration_max:
             raise ValueError("JWT expiration initial must be less than JWT expiration max.")
-        if values["jwt_expiration_step"] + values["jwt_expiration_initial"] > values["jwt_expiration_max"]:
+        if self.jwt_expiration_step + self.jwt_expiration_initial > self.jwt_expiration_max:
             raise ValueError("JWT expiration step plus JWT expiration initial must be less than JWT expiration max.")
-        return values
-
-    class Config:  # pylint: disable=too-few-public-methods
-        """Set orm_mode to True to allow returning ORM objects."""
+        return self
 
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
-class RunningJWTSettings(JWTSettings, Singleton):
+class RunningJWTSettings(JWTSettings):
     """Running JWT Settings."""
@@ -1,34 +1,42 @@
 """JWT Utils."""
-from typing import Annotated
+import asyncio
+from time import monotonic
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from api.core.database import session
-from api.core.jwt.model import AuthRequest, JWTFactory, Token
+from api.core.jwt.model import AuthRequest, JWTFactory, RefreshTokenFactory, Token
+from api.core.logs.utils import audit_logger
+from api.core.metrics.utils import authenticate_seconds
 from api.core.settings.utils import running_settings
+from api.core.state import get_state
 from api.core.utils import hash_handler
 from api.users.model import UserBase, UserDB
-from api.users.orm import UserORM
+from api.users.orm import UserORM, user_by_email, user_by_key, user_by_username, user_token_generation
+from api.users.utils import compare_and_swap
 
 jwt_factory = JWTFactory()
+refresh_factory = RefreshTokenFactory()
 barear = OAuth2PasswordBearer(tokenUrl="/auth/login-form")
 
 
 def validete(username: str) -> UserDB:
     """Validate a user status."""
-    # Get user from database
+    # Get user from the primary, a replica may be behind on strikes, blocks and versions
     with session() as database_session:
+        user = None
         if running_settings.users.allow_login_with_email:
-            user = database_session.query(UserORM).filter(UserORM.email == username).first()
+            user = database_session.execute(user_by_email, {"email": username}).scalar_one_or_none()
         if user is None and running_settings.users.allow_login_with_username:
-            user = database_session.query(UserORM).filter(UserORM.username == username).first()
+            user = database_session.execute(user_by_username, {"username": username}).scalar_one_or_none()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden: Wrong credetials or user is not active, not verified or is blocked.",
             )
-        user = UserDB.from_orm(user)  # type: ignore
+        user = UserDB.model_validate(user)  # type: ignore
         # MyPy: Incompatible types in assignment (expression has type "UserDB", variable has type "Optional[UserORM]"
         # Validate if user is blocked
         if user.blocked:
@@ -51,50 +59,124 @@ def validete(username: str) -> UserDB:
         return user
 
 
+@authenticate_seconds.time()
 def authenticate(credentials: AuthRequest) -> Token:
     """Login a user."""
-    user: UserDB = validete(username=credentials.username)
+    # Unknown, blocked, inactive or not verified users fail before their password is checked
+    try:
+        user: UserDB = validete(username=credentials.username)
+    except HTTPException:
+        audit_logger.warning(
+            "Login failed.", extra={"event": "login", "result": "failure", "username": credentials.username}
+        )
+        raise
     # Validate password
     if hash_handler.verify_hash(password=credentials.password, hash=user.password_hash) is False:
-        # Update password attempts count.
-        user.password_strikes += 1
-        if running_settings.users.block_user_on_password_strickes > 0:
-            if user.password_strikes >= (running_settings.users.password_strikes - 1):
-                user.blocked = True
+        # Update password attempts count, retry if a concurrent login changed the user meanwhile.
         with session() as database_session:
-            user_db = database_session.query(UserORM).filter(UserORM.email == user.email).first()
-            for key, value in user.dict().items():
-                setattr(user_db, key, value)
+            while True:
+                strikes = user.password_strikes + 1
+                blocked = user.blocked
+                if running_settings.users.block_user_on_password_strickes > 0:
+                    if strikes >= (running_settings.users.password_strikes - 1):
+                        blocked = True
+                # Blocking the user invalidates its tokens
+                revoke: dict[str, Any] = {}
+                if blocked and not user.blocked:
+                    revoke["token_generation"] = UserORM.token_generation + 1
+                if compare_and_swap(
+                    database_session,
+                    key=user.key,
+                    version=user.version,
+                    password_strikes=strikes,
+                    blocked=blocked,
+                    **revoke,
+                ):
+                    break
+                database_session.rollback()
+                user_db = database_session.execute(user_by_key, {"key": user.key}).scalar_one_or_none()
+                if user_db is None:
+                    break
+                user = UserDB.model_validate(user_db)
             database_session.commit()
+            get_state().token_generations.pop(user.email, None)
+            audit_logger.warning(
+                "Login failed.", extra={"event": "login", "result": "failure", "user": user.key, "blocked": blocked}
+            )
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden: Wrong credetials or user is not active, not verified or is blocked.",
             )
-    # Reset password attempts count.
-    user.password_strikes = 0  # type: ignore
-    # MyPy: Incompatible types in assignment.
-    with session() as database_session:
-        user_db = database_session.query(UserORM).filter(UserORM.email == user.email).first()
-        for key, value in user.dict().items():
-            setattr(user_db, key, value)
-    database_session.commit()
-    token = jwt_factory.create(email=user.email)
-    return Token(access_token=token)
+    # Reset password attempts count, only write if there is something to reset.
+    while user.password_strikes != 0:
+        with session() as database_session:
+            if compare_and_swap(database_session, key=user.key, version=user.version, password_strikes=0):
+                database_session.commit()
+                break
+        # A concurrent login changed the user meanwhile, it may be blocked now
+        user = validete(username=credentials.username)
+    audit_logger.info("Login succeeded.", extra={"event": "login", "result": "success", "user": user.key})
+    family = refresh_factory.new_family()
+    return Token(
+        access_token=access_token(user, family),
+        refresh_token=refresh_factory.create(subject=user.email, generation=user.token_generation, family=family),
+    )
+
+
+def access_token(user: UserDB, family: str) -> str:
+    """
+    Generate an access token for a user, carrying what identify needs to skip reading the user.
+
+    The family of the refresh tokens of the login is the session id, logging out revokes them too.
+    """
+    return jwt_factory.create(
+        email=user.email,
+        generation=user.token_generation,
+        name=user.name,
+        preferred_username=user.username,
+        sid=family,
+    )
+
+
+def check_generation(claims: dict[str, Any]) -> None:
+    """
+    Check that a token belongs to the current token generation of its user.
+
+    The generation of each user is read from the database at most once per jwt_generation_cache_seconds.
+    """
+    subject = str(claims["sub"])
+    generations = get_state().token_generations
+    cached = generations.get(subject)
+    if cached is None or monotonic() - cached[1] > running_settings.jwt.jwt_generation_cache_seconds:
+        with session() as database_session:
+            generation = database_session.execute(user_token_generation, {"email": subject}).scalar_one_or_none()
+        cached = generations[subject] = (generation, monotonic())
+    if cached[0] is None or claims.get("gen", 0) != cached[0]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authorized: Invalid token.",
+        )
 
 
 def identify(token: Token) -> UserBase:
     """Validate Token, and return a UserBase object."""
-    # Validate and get subject from token
-    subject = jwt_factory.verify(token.access_token)
-    user = validete(username=subject)
-    # Validate user
-    return UserBase(**user.dict())
+    # Validate and get claims from token
+    claims = jwt_factory.verify_claims(token.access_token)
+    # Blocking or logging out everywhere bumps the generation
+    check_generation(claims)
+    if "name" in claims and "preferred_username" in claims:
+        # Signed claims of a validated user, no need to validate them again
+        return UserBase.model_construct(username=claims["preferred_username"], name=claims["name"], email=claims["sub"])
+    user = validete(username=claims["sub"])
+    return UserBase(**user.model_dump())
 
 
 def renew(token: Token) -> Token:
     """Renew a token."""
-    # Validate and get subject from token
-    if jwt_factory.verify(token.access_token) is not None:
+    # Validate and get claims from token
+    claims = jwt_factory.verify_claims(token.access_token)
+    if claims is not None:
+        check_generation(claims)
         new_token = Token(access_token=jwt_factory.renew(token=token.access_token))
         jwt_factory.revoke(token.access_token)
         return new_token
@@ -104,12 +186,40 @@ def renew(token: Token) -> Token:
     )
 
 
+def refresh(refresh_token: str) -> Token:
+    """Exchange a refresh token for a new access token and a new refresh token, nothing is revoked."""
+    subject, generation, family, new_refresh_token = refresh_factory.rotate(refresh_token)
+    # The user must still be allowed to login, and not have logged out everywhere
+    user = validete(username=subject)
+    if user.token_generation != generation:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authorized: Invalid token.",
+        )
+    return Token(access_token=access_token(user, family), refresh_token=new_refresh_token)
+
+
 def revoke(token: Token) -> bool:
-    """Revoke a token."""
+    """Revoke a token, and the refresh tokens of its login."""
+    claims = jwt_factory.parce(token.access_token)
     jwt_factory.revoke(token.access_token)
+    if claims.get("sid"):
+        refresh_factory.revoke_family(str(claims["sid"]))
     return True
 
 
+def purge() -> int:
+    """Remove the expired revoked tokens and refresh tokens, and return how many were removed."""
+    return jwt_factory.purge() + refresh_factory.purge()
+
+
+async def purge_revoked_tokens(interval: float = 300) -> None:
+    """Remove the expired revoked tokens and refresh tokens every interval seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(purge)
+
+
 def get_current_user(token: Annotated[str, Depends(barear)]) -> UserBase:
     """Get current user."""
     return identify(token=Token(access_token=token))
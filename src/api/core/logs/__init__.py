@@ -0,0 +1 @@
+"""Logs Module."""
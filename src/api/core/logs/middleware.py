@@ -0,0 +1,61 @@
+"""Logs Middleware."""
+import logging
+import random
+from time import perf_counter
+from typing import Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.core.logs.utils import access_logger
+from api.core.metrics.utils import current_queries
+
+
+class AccessLogMiddleware:
+    """
+    Log every request, with its route, status, duration and database queries.
+
+    Requests to the sampled paths are only logged at the sample rate, unless they fail.
+    """
+
+    def __init__(self, app: ASGIApp, sampled_paths: Iterable[str] = (), sample_rate: float = 1.0) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.sampled_paths = frozenset(sampled_paths)
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        if scope["type"] != "http" or not access_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampled = scope["path"] in self.sampled_paths and status < 500
+            if not sampled or random.random() < self.sample_rate:  # nosec B311
+                queries = current_queries.get() or []
+                access_logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    extra={
+                        "event": "request",
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": getattr(scope.get("route"), "path", None),
+                        "status": status,
+                        "duration_ms": round((perf_counter() - start) * 1000, 3),
+                        "queries": len(queries),
+                        "client": scope["client"][0] if scope.get("client") else None,
+                    },
+                )
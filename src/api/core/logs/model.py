@@ -0,0 +1,74 @@
+"""Logs Model."""
+import logging
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from threading import Lock
+
+from api.core.responses import dumps
+
+# Attributes every log record has, anything else was given as extra fields.
+_RECORD_ATTRIBUTES = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, with the extra fields of the record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record."""
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return dumps(entry).decode("utf-8")
+
+
+class LogWriter:
+    """
+    Write the api logs from a background thread.
+
+    Loggers only put records on a queue, so logging never does I/O on the request path.
+    It is shared by the applications of the process, and runs while at least one of them is running.
+    """
+
+    def __init__(self, logger: str = "api") -> None:
+        """Create the writer for a logger and its children."""
+        self.logger = logging.getLogger(logger)
+        self.queue: SimpleQueue = SimpleQueue()
+        self.handler = QueueHandler(self.queue)
+        self.listener: QueueListener | None = None
+        self.users = 0
+        self.lock = Lock()
+
+    def start(self, level: str = "INFO") -> None:
+        """Start writing, the first call starts the background thread."""
+        with self.lock:
+            self.users += 1
+            self.logger.setLevel(level)
+            if self.listener is not None:
+                return
+            output = logging.StreamHandler(sys.stdout)
+            output.setFormatter(JSONFormatter())
+            self.listener = QueueListener(self.queue, output, respect_handler_level=True)
+            self.listener.start()
+            self.logger.addHandler(self.handler)
+            self.logger.propagate = False
+
+    def stop(self) -> None:
+        """Stop writing, the last call flushes the queue and stops the background thread."""
+        with self.lock:
+            self.users -= 1
+            if self.users > 0 or self.listener is None:
+                return
+            self.logger.removeHandler(self.handler)
+            self.logger.propagate = True
+            self.listener.stop()
+            self.listener = None
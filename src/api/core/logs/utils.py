@@ -0,0 +1,12 @@
+"""Logs Utils."""
+import logging
+
+from api.core.logs.model import LogWriter
+
+# Background writer of the api logs
+log_writer = LogWriter("api")
+
+# One entry per request
+access_logger = logging.getLogger("api.access")
+# Security relevant actions: logins, revocations and settings changes
+audit_logger = logging.getLogger("api.audit")
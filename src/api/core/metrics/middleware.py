@@ -0,0 +1,91 @@
+"""Metrics Middleware."""
+import logging
+from time import perf_counter
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.core.metrics.utils import current_queries, request_queries, request_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more database queries than the budget."""
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the database queries and the database time of each request.
+
+    The counts are sent on the Server-Timing header, if enabled.
+    Requests running more queries than the budget are logged, or fail if strict, to catch regressions in tests.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int | None, server_timing: bool = False, strict: bool = False) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.budget = budget
+        self.server_timing = server_timing
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries: list[float] = []
+        token = current_queries.set(queries)
+        start = perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={sum(queries) * 1000:.3f};desc="{len(queries)} queries", '
+                    f"app;dur={(perf_counter() - start) * 1000:.3f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
+        if self.budget is not None and len(queries) > self.budget:
+            route = getattr(scope.get("route"), "path", scope["path"])
+            message = f"{scope['method']} {route} ran {len(queries)} queries, the budget is {self.budget}."
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class MetricsMiddleware:
+    """Record the latency and the database queries of each request, by route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap the application."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            queries = current_queries.get() or []
+            # Use the route template, not the path, to keep the number of series bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_seconds.observe(perf_counter() - start, scope["method"], route, str(status))
+            request_queries.observe(len(queries), route)
@@ -0,0 +1,166 @@
+"""Metrics Model."""
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterator
+
+# Default histogram buckets, in seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """
+    Collection of metrics, rendered in the Prometheus text format.
+
+    When disabled, metrics ignore every update, so instrumented code pays only for a boolean check.
+    Whether it is enabled is asked on each update, so it can follow the application handling it.
+    """
+
+    def __init__(self, enabled: Callable[[], bool] = lambda: True) -> None:
+        """Create an empty registry, enabled returns whether updates are recorded."""
+        self.is_enabled = enabled
+        self.metrics: list["Metric"] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether updates are recorded."""
+        return self.is_enabled()
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class Metric:
+    """Metric with a value for each combination of labels."""
+
+    kind = "untyped"
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        """Create the metric and register it."""
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.lock = Lock()
+        registry.metrics.append(self)
+
+    def format_labels(self, values: tuple[str, ...], bound: str | None = None) -> str:
+        """Format the labels of a sample, with the bucket bound of histograms."""
+        pairs = [f'{label}="{value}"' for label, value in zip(self.labels, values)]
+        if bound is not None:
+            pairs.append(f'le="{bound}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        """Return the sample lines of the metric."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        """Create the counter."""
+        super().__init__(registry, name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the counter of the labels."""
+        if not self.registry.enabled:
+            return
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        """Return the sample lines of the counter."""
+        with self.lock:
+            return [f"{self.name}{self.format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Metric):
+    """Value that goes up and down, usually set when scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, registry: Registry, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        """Create the gauge."""
+        super().__init__(registry, name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the gauge of the labels."""
+        if not self.registry.enabled:
+            return
+        with self.lock:
+            self.values[labels] = value
+
+    def samples(self) -> list[str]:
+        """Return the sample lines of the gauge."""
+        with self.lock:
+            return [f"{self.name}{self.format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Histogram(Metric):
+    """Distribution of observed values, counted in buckets."""
+
+    kind = "histogram"
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        registry: Registry,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = BUCKETS,
+    ) -> None:
+        """Create the histogram."""
+        super().__init__(registry, name, documentation, labels)
+        self.buckets = buckets
+        # Count of each bucket, not cumulative, plus the sum and the count of observations.
+        self.values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record an observation for the labels."""
+        if not self.registry.enabled:
+            return
+        with self.lock:
+            counts, total, count = self.values.get(labels) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self.values[labels] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the time taken by the block, in seconds."""
+        if not self.registry.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, *labels)
+
+    def samples(self) -> list[str]:
+        """Return the sample lines of the histogram."""
+        lines = []
+        with self.lock:
+            for key, (counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    lines.append(f"{self.name}_bucket{self.format_labels(key, str(bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{self.format_labels(key, '+Inf')} {count}")
+                lines.append(f"{self.name}_sum{self.format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{self.format_labels(key)} {count}")
+        return lines
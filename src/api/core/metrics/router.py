@@ -0,0 +1,33 @@
+"""Metrics router."""
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+
+from api.core.database import get_engine
+from api.core.metrics.utils import database_pool, registry
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Metrics in the Prometheus text format."},
+    },
+)
+def get_metrics() -> PlainTextResponse:
+    """
+    Get Metrics.
+
+    Return the metrics of this process, in the Prometheus text format.
+    """
+    # Read the pool usage at scrape time
+    pool = get_engine().pool
+    if isinstance(pool, QueuePool):
+        database_pool.set(pool.size(), "size")
+        database_pool.set(pool.checkedout(), "checked_out")
+        database_pool.set(pool.checkedin(), "checked_in")
+        database_pool.set(pool.overflow(), "overflow")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,45 @@
+"""Metrics Utils."""
+from contextvars import ContextVar
+
+from api.core.metrics.model import Counter, Gauge, Histogram, Registry
+from api.core.state import get_state
+
+# Metrics of this process, every worker exposes its own, recorded while the current application enables them.
+registry = Registry(lambda: get_state().environment.metrics_enabled)
+
+# Requests
+request_seconds = Histogram(
+    registry, "api_request_seconds", "Time taken to handle a request.", labels=("method", "route", "status")
+)
+request_queries = Histogram(
+    registry,
+    "api_request_queries",
+    "Database queries run by a request.",
+    labels=("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+# Database
+query_seconds = Histogram(registry, "api_database_query_seconds", "Time taken by a database query.")
+database_pool = Gauge(registry, "api_database_pool_connections", "Connections of the database pool.", labels=("state",))
+
+# Hot paths
+password_hash_seconds = Histogram(
+    registry, "api_password_hash_seconds", "Time taken to hash or verify a password.", labels=("operation",)
+)
+authenticate_seconds = Histogram(registry, "api_authenticate_seconds", "Time taken to authenticate a user.")
+token_verify_seconds = Histogram(registry, "api_token_verify_seconds", "Time taken to verify a token.")
+revoked_lookups = Counter(
+    registry, "api_revoked_token_lookups_total", "Lookups on the revoked tokens store.", labels=("store", "result")
+)
+paginator_seconds = Histogram(registry, "api_paginator_seconds", "Time taken to query a page.")
+settings_load_seconds = Histogram(registry, "api_settings_load_seconds", "Time taken to load the settings.")
+settings_cache = Counter(
+    registry,
+    "api_settings_cache_total",
+    "Settings loads, hit if the stored settings did not change.",
+    labels=("result",),
+)
+
+# Queries run by the current request, a list so threads running the request can update it.
+current_queries: ContextVar[list[float] | None] = ContextVar("current_queries", default=None)
@@ -8,6 +8,8 @@ from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 from pydantic import BaseModel, Field
 
+from api.core.metrics.utils import password_hash_seconds
+
 
 class Singleton:
     """Singgleton implementation."""
@@ -125,19 +127,21 @@ class HashHandler(Singleton):
 
     def generate_hash(self, password: str) -> str:
         """Return a hashed password."""
-        return str(PasswordHasher().hash(password))  # pylint: disable=redefined-builtin
+        with password_hash_seconds.time("hash"):
+            return str(PasswordHasher().hash(password))  # pylint: disable=redefined-builtin
         # PyLint W0622: Redefining built-in 'hash' (redefined-builtin)
 
     def verify_hash(self, password: str, hash: str) -> bool:  # pylint: disable=redefined-builtin
         # PyLint W0622: Redefining built-in 'hash' (redefined-builtin)
         """Verify if the hash is valid."""
-        try:
-            return PasswordHasher().verify(hash=hash, password=password)
-        except VerifyMismatchError:
-            return False
+        with password_hash_seconds.time("verify"):
+            try:
+                return PasswordHasher().verify(hash=hash, password=password)
+            except VerifyMismatchError:
+                return False
 
 
 class SimpleMessage(BaseModel):
     """Simple message model."""
 
-    status: str = Field(example="OK", title="Status", description="Status message")
+    status: str = Field(examples=["OK"], title="Status", description="Status message")
@@ -1,10 +1,9 @@
 """Paginator schema."""
 from typing import List
 
-from fastapi import Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, SerializeAsAny, field_validator
 
-from api.core.settings.utils import get_running_settings
+from api.core.settings.utils import running_settings
 
 
 class QueryBase(BaseModel):
@@ -18,15 +17,22 @@ class QueryBase(BaseModel):
         records (int): Number of records to return.
     """
 
-    page: int = Query(default=1, title="Page number", description="Page number to return.", gt=0)
-    records: int = Query(
+    page: int = Field(default=1, title="Page number", description="Page number to return.", gt=0)
+    records: int = Field(
         default=100,
         title="Records per page",
         description="Number of records to return.",
         gt=0,
-        le=get_running_settings().api.page_size_max,
     )
 
+    @field_validator("records")
+    @classmethod
+    def records_must_fit_page(cls, value):
+        """Validate records against the maximum page size of the running settings."""
+        if value > running_settings.api.page_size_max:
+            raise ValueError(f"records must be less than or equal to {running_settings.api.page_size_max}")
+        return value
+
 
 class PageBase(BaseModel):
     """
@@ -40,7 +46,7 @@ class PageBase(BaseModel):
         total_records (int): Total records.
     """
 
-    records: List[BaseModel]
+    records: List[SerializeAsAny[BaseModel]]
     query: QueryBase
     total_pages: int
     total_records: int
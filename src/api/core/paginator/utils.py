@@ -1,13 +1,17 @@
 """Paginator Utils."""
 from math import ceil
-from typing import List
+from typing import List, Type
 
 from pydantic import BaseModel
+from sqlalchemy import func, select
 
-from api.core.database import BaseModelORM, session
+from api.core.database import BaseModelORM, read_session
+from api.core.metrics.utils import paginator_seconds
 from api.core.paginator.model import PageBase, QueryBase
+from api.core.responses import FastJSONResponse
 
 
+@paginator_seconds.time()
 def executor(orm, schema: BaseModel, query: QueryBase) -> PageBase:
     """
     Do SQL Alchmy queries, and return a page with the results.
@@ -27,14 +31,20 @@ def executor(orm, schema: BaseModel, query: QueryBase) -> PageBase:
     if orm not in BaseModelORM.__subclasses__():
         raise ValueError(f"orm model {orm} is unknown.")
     # Run Query
-    with session() as database_session:
+    with read_session() as database_session:
         total_records = database_session.query(orm).count()
         total_pages = ceil(total_records / query.records)
-        records_database = database_session.query(orm).offset(query.page - 1).limit(query.records).all()
+        records_database = (
+            database_session.query(orm)
+            .order_by(*orm.__table__.primary_key)
+            .offset((query.page - 1) * query.records)
+            .limit(query.records)
+            .all()
+        )
         # Convert to Pydantic Model
         records: List[BaseModel] = []
         for record in records_database:
-            records.append(schema.from_orm(record))
+            records.append(schema.model_validate(record))
         # Return Page
         return PageBase(
             records=records,  # type: ignore
@@ -42,3 +52,50 @@ def executor(orm, schema: BaseModel, query: QueryBase) -> PageBase:
             total_pages=total_pages,
             total_records=total_records,
         )
+
+
+@paginator_seconds.time()
+def executor_response(orm, schema: Type[BaseModel], query: QueryBase) -> FastJSONResponse:
+    """
+    Do SQL Alchmy queries, and return a rendered response with the page.
+
+    Only the columns of the schema fields are selected, and the rows are written straight into the page,
+    without building ORM objects or validating Pydantic Models, the data from the database is trusted.
+
+    Args:
+        orm (BaseModelORM): An Registred SQL Alchemy ORM Model.
+        schema (BaseModel): Pydantic Schema Model, all fields must be columns of the orm model.
+        query (QueryBase): Pydantic Query Model, herated from QueryBase.
+
+    Raises:
+        ValueError: If orm_model is unknown, or the schema has fields that are not columns.
+
+    Returns:
+        FastJSONResponse: Rendered Page.
+    """
+    # validate if the orm_model is known.
+    if orm not in BaseModelORM.__subclasses__():
+        raise ValueError(f"orm model {orm} is unknown.")
+    # Map schema fields to columns
+    aliases = [field.alias or name for name, field in schema.model_fields.items()]
+    columns = [getattr(orm, name, None) for name in schema.model_fields]
+    if any(column is None for column in columns):
+        raise ValueError(f"schema {schema} has fields that are not columns of {orm}.")
+    # Run Query
+    with read_session() as database_session:
+        total_records = database_session.execute(select(func.count()).select_from(orm)).scalar_one()
+        rows = database_session.execute(
+            select(*columns)
+            .order_by(*orm.__table__.primary_key)
+            .offset((query.page - 1) * query.records)
+            .limit(query.records)
+        ).all()
+    # Return Page
+    return FastJSONResponse(
+        content={
+            "records": [dict(zip(aliases, row)) for row in rows],
+            "query": query.model_dump(),
+            "total_pages": ceil(total_records / query.records),
+            "total_records": total_records,
+        }
+    )
@@ -0,0 +1 @@
+"""Profiler Module."""
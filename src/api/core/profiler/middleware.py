@@ -0,0 +1,77 @@
+"""Profiler Middleware."""
+from contextvars import ContextVar
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.core.jwt.model import Token
+from api.core.jwt.utils import identify
+from api.core.profiler.sampler import StackSampler
+
+# Sampler of the profiled request being handled, only the stacks running for it are sampled.
+profiled_request: ContextVar[StackSampler | None] = ContextVar("profiled_request", default=None)
+
+
+class ProfilerMiddleware:
+    """
+    Profile single requests, sent with the X-Profile header and a valid access token.
+
+    The response is replaced by the collapsed stacks sampled while handling the request,
+    the original status is sent on the X-Profile-Status header.
+    Requests without a valid token are handled as if they had no X-Profile header.
+    """
+
+    def __init__(self, app: ASGIApp, interval: float = 0.001) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        if scope["type"] != "http" or "x-profile" not in Headers(scope=scope):
+            await self.app(scope, receive, send)
+            return
+        if not await self.authorized(Headers(scope=scope).get("authorization", "")):
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        sampler = StackSampler(interval=self.interval, variable=profiled_request)
+        token = profiled_request.set(sampler)
+        sampler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            body = sampler.stop().encode("utf-8")
+            profiled_request.reset(token)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profile-status", str(status).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def authorized(authorization: str) -> bool:
+        """Return True if the Authorization header carries a valid access token."""
+        scheme, _, access_token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not access_token:
+            return False
+        try:
+            await run_in_threadpool(identify, Token(access_token=access_token))
+        except HTTPException:
+            return False
+        return True
@@ -0,0 +1,35 @@
+"""Profiler router."""
+import threading
+import time
+
+from fastapi import APIRouter, Query, status
+from fastapi.responses import PlainTextResponse
+
+from api.core.dependencies import Authenticate
+from api.core.profiler.sampler import StackSampler
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Collapsed stacks, for flamegraph tools."},
+        401: {"description": "Not authorized."},
+    },
+)
+def get_profile(
+    who: Authenticate,  # pylint: disable=unused-argument
+    seconds: float = Query(default=5, gt=0, le=60, description="Time to sample, in seconds."),
+    interval: float = Query(default=5, ge=1, le=1000, description="Time between samples, in milliseconds."),
+) -> PlainTextResponse:
+    """
+    Get Profile.
+
+    Sample the stacks of the threads of this worker, and return them in the collapsed stack format.
+    """
+    sampler = StackSampler(interval=interval / 1000, ignore=frozenset({threading.get_ident()})).start()
+    time.sleep(seconds)
+    return PlainTextResponse(sampler.stop())
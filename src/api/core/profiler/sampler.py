@@ -0,0 +1,78 @@
+"""Sampling Profiler."""
+import sys
+import threading
+from collections import Counter
+from contextvars import Context, ContextVar
+from types import FrameType
+from typing import Any
+
+
+def collapse(frame: FrameType | None) -> str:
+    """Return a stack as module:function frames, from the root, separated by semicolons."""
+    frames = []
+    while frame is not None:
+        frames.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def runs_in(frame: FrameType | None, variable: ContextVar, value: Any) -> bool:
+    """
+    Return True if a stack runs in a context where the variable is set to the value.
+
+    Asyncio task steps run their handle in the context of the task, and worker threads run the calls
+    in the context of their caller, so the context is found on the locals of a frame of the stack.
+    """
+    while frame is not None:
+        local = frame.f_locals
+        for context in (local.get("context"), getattr(local.get("self"), "_context", None)):
+            if isinstance(context, Context) and context.get(variable) is value:
+                return True
+        frame = frame.f_back
+    return False
+
+
+class StackSampler:
+    """
+    Sample the stacks of the running threads, from a background thread.
+
+    The result is in the collapsed stack format, one stack and its number of samples per line,
+    ready for flamegraph.pl, speedscope or inferno.
+    With a context variable, only the stacks running in a context where it is set to the sampler are kept.
+    """
+
+    def __init__(
+        self, interval: float = 0.005, ignore: frozenset[int] = frozenset(), variable: ContextVar | None = None
+    ) -> None:
+        """Create the sampler, the ignored threads and the sampler thread are not sampled."""
+        self.interval = interval
+        self.ignore = ignore
+        self.variable = variable
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        ignore = self.ignore | {threading.get_ident()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if thread_id in ignore:
+                    continue
+                if self.variable is None or runs_in(frame, self.variable, self):
+                    self.stacks[collapse(frame)] += 1
+
+    def start(self) -> "StackSampler":
+        """Start sampling."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> str:
+        """Stop sampling, and return the collapsed stacks."""
+        self._stop.set()
+        self._thread.join()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Return the collapsed stacks, the most sampled first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
@@ -0,0 +1,90 @@
+"""Startup Profiler."""
+import json
+import os
+import subprocess  # nosec B404
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+# Time taken by each startup step, in seconds.
+timings: dict[str, float] = {}
+
+# Code run on a fresh interpreter, so nothing is already imported.
+_CHILD = """
+import asyncio, json
+from time import perf_counter
+start = perf_counter()
+from api.main import app
+from api.core.state import default_state
+imported = perf_counter()
+async def _start():
+    async with app.router.lifespan_context(app):
+        while not default_state().ready:
+            await asyncio.sleep(0.01)
+asyncio.run(_start())
+from api.core.profiler.startup import timings
+print(json.dumps({"import": imported - start, "startup": perf_counter() - imported, "steps": timings}))
+"""
+
+
+@contextmanager
+def timed(step: str) -> Iterator[None]:
+    """Record the time taken by a startup step."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings[step] = perf_counter() - start
+
+
+def parse_importtime(output: str) -> list[tuple[str, int, int]]:
+    """
+    Parse the output of python -X importtime.
+
+    Args:
+        output (str): Standard error of the interpreter.
+
+    Returns:
+        list[tuple[str, int, int]]: Module, self time and cumulative time, in microseconds.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:") :].split("|")
+        modules.append((module.strip(), int(own), int(cumulative)))
+    return modules
+
+
+def profile_startup(top: int = 25) -> str:
+    """
+    Import and start the application on a fresh interpreter, and report where the time goes.
+
+    Args:
+        top (int, optional): Number of modules to show, the slowest first. Defaults to 25.
+
+    Returns:
+        str: Report.
+    """
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)},
+    )
+    modules = parse_importtime(result.stderr)
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    lines = [
+        f"Import of api.main: {summary['import'] * 1000:10.1f} ms",
+        f"Application startup: {summary['startup'] * 1000:9.1f} ms",
+        "",
+        f"{'Startup step':<40} {'ms':>10}",
+    ]
+    for step, seconds in summary["steps"].items():
+        lines.append(f"{step:<40} {seconds * 1000:10.1f}")
+    lines += ["", f"{'Module':<60} {'self ms':>10} {'total ms':>10}"]
+    for module, own, cumulative in sorted(modules, key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{module:<60} {own / 1000:10.1f} {cumulative / 1000:10.1f}")
+    return "\n".join(lines)
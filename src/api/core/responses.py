@@ -0,0 +1,31 @@
+"""Core Responses."""
+import json
+from datetime import date, datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from api.core.utils import environment
+
+
+def _default(value: Any) -> Any:
+    """Serialize the types the standard json library does not know."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Render content as JSON, with the renderer selected on the environment."""
+    if environment.json_renderer == "orjson":
+        return bytes(orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS))
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the environment JSON renderer."""
+
+    def render(self, content: Any) -> bytes:
+        """Render the content."""
+        return dumps(content)
@@ -1,16 +1,68 @@
 """Settings schema."""
 import json
+from datetime import datetime
+from typing import Any, Iterable
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
-from api.core.database import session
+from api.core.database import read_session, session
 from api.core.jwt.settings import JWTSettings, RunningJWTSettings
-from api.core.model import Singleton
-from api.core.settings.orm import SettingsORM
+from api.core.metrics.utils import settings_cache, settings_load_seconds
+from api.core.settings.orm import (
+    SettingsORM,
+    record_section,
+    settings_by_names,
+    settings_versions,
+    swap_section,
+    update_section,
+)
 from api.core.utils import environment
 from api.users.settings import RunningUserSettings, UserSettings
 
 
+class SettingsConflict(RuntimeError):
+    """The stored settings kept changing while a patch was applied."""
+
+
+class SettingsInvalid(ValueError):
+    """A patched settings section is not valid, the location of each error starts with the section name."""
+
+    def __init__(self, section: str, error: ValidationError) -> None:
+        """Keep the errors of the section."""
+        super().__init__(f"Invalid {section} settings.")
+        self.errors = [
+            {**detail, "loc": (section, *detail["loc"])}
+            for detail in error.errors(include_url=False, include_context=False)
+        ]
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply a JSON merge patch (RFC 7386) to a JSON value, and return the result.
+
+    Objects are merged member by member, members set to null are removed, any other value replaces the target.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    merged = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = merge_patch(merged.get(key), value)
+    return merged
+
+
+def record_history(database_session: Session, sections: Iterable[str]) -> None:
+    """Append the current version of the sections to the history, in the transaction of the session."""
+    database_session.flush()
+    changed_at = datetime.utcnow()
+    for name in sections:
+        database_session.execute(record_section, {"section": name, "changed_at": changed_at})
+
+
 class APISettings(BaseModel):
     """API configuration."""
 
@@ -27,14 +79,27 @@ class APISettings(BaseModel):
         description="Maximum number of items returned in a single page.",
         gt=1,
     )
+    # Response compression
+    compression_minimum_size: int = Field(
+        default=1024,
+        title="Compression minimum size",
+        description="Responses smaller than this number of bytes are sent uncompressed.",
+        ge=0,
+    )
+    compression_level: int = Field(
+        default=6,
+        title="Compression level",
+        description="Compression level, from 1 (fastest), clamped to the highest of each encoding: "
+        "9 for gzip, 11 for brotli and 22 for zstd.",
+        ge=1,
+        le=22,
+    )
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
-
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
-class RunningAPISettings(APISettings, Singleton):
+class RunningAPISettings(APISettings):
     """Running API Configuration."""
 
 
@@ -45,64 +110,151 @@ class Settings(BaseModel):
     jwt: JWTSettings = JWTSettings()
     users: UserSettings = UserSettings()
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
-
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
-class RunningSettings(Settings, Singleton):
+class RunningSettings(Settings):
     """Running Application Configuration."""
 
     api: RunningAPISettings = RunningAPISettings()
     jwt: RunningJWTSettings = RunningJWTSettings()
     users: RunningUserSettings = RunningUserSettings()
 
-    def save(self) -> bool:
-        """Save the configuration to the database."""
-        with session() as database_session:
-            # Query the database for the settings
-            settings_from_database = database_session.query(SettingsORM).filter(SettingsORM.name == "global").first()
-            # If the settings exist, update them
-            if not settings_from_database:
-                database_session.add(SettingsORM(name="global", data=str(self.json())))
-                database_session.commit()
-            else:
-                settings_from_database.data = str(self.json())  # type: ignore
-                database_session.commit()
+    # Version of each stored section last applied, to load only the sections that changed.
+    _versions: dict[str, int] = PrivateAttr(default_factory=dict)
 
+    def save(self, sections: Iterable[str] | None = None) -> bool:
+        """Save the configuration to the database, only the given sections, or all of them."""
+        names = list(type(self).model_fields) if sections is None else list(sections)
+        if not names:
+            return True
+        with session() as database_session:
+            for name in names:
+                data = getattr(self, name).model_dump_json()
+                # Bump the version of the section, or create it
+                if database_session.execute(update_section, {"section": name, "section_data": data}).rowcount == 0:
+                    database_session.add(SettingsORM(name=name, data=data, version=1))
+            record_history(database_session, names)
+            database_session.commit()
+            versions = dict(database_session.execute(settings_versions).all())
+        self._versions.update({name: versions[name] for name in names})
         return True
 
+    def merge(self, patch: dict[str, Any], retries: int = 3) -> list[str]:
+        """
+        Apply a JSON merge patch to the stored settings, and return the sections it changed.
+
+        Only the patched sections are read, validated against their model and written, all of them or none.
+        Members set to null go back to their default, sections set to null too.
+        A section is only written if nobody changed it since it was read, otherwise the patch is applied again
+        on the new value, so concurrent changes to other members are kept.
+
+        Raises:
+            ValueError: If the patch has unknown sections.
+            SettingsInvalid: If the result is not valid.
+            SettingsConflict: If the sections kept changing after the retries.
+        """
+        fields = type(self).model_fields
+        unknown = [name for name in patch if name not in fields]
+        if unknown:
+            raise ValueError(f"Unknown settings sections: {', '.join(unknown)}.")
+        for _ in range(retries):
+            with session() as database_session:
+                stored = {
+                    section.name: section
+                    for section in database_session.execute(settings_by_names, {"names": list(patch)}).scalars()
+                }
+                changed: dict[str, BaseModel] = {}
+                swapped = True
+                for name, section_patch in patch.items():
+                    row = stored.get(name)
+                    current = (
+                        json.loads(str(row.data)) if row is not None else getattr(self, name).model_dump(mode="json")
+                    )
+                    model = fields[name].annotation
+                    if section_patch is None:
+                        # Back to the defaults
+                        merged = model().model_dump(mode="json")  # type: ignore[misc]
+                    else:
+                        merged = merge_patch(current, section_patch)
+                    if merged == current:
+                        continue
+                    try:
+                        section = model.model_validate(merged)  # type: ignore[union-attr]
+                    except ValidationError as error:
+                        raise SettingsInvalid(name, error) from error
+                    data = section.model_dump_json()
+                    if row is None:
+                        database_session.add(SettingsORM(name=name, data=data, version=1))
+                    elif not database_session.execute(
+                        swap_section, {"section": name, "section_data": data, "section_version": row.version}
+                    ).rowcount:
+                        swapped = False
+                        break
+                    changed[name] = section
+                if not swapped:
+                    database_session.rollback()
+                    continue
+                try:
+                    record_history(database_session, changed)
+                    database_session.commit()
+                except IntegrityError:
+                    # Another request created the section meanwhile
+                    database_session.rollback()
+                    continue
+                versions = dict(database_session.execute(settings_versions).all())
+            for name, section in changed.items():
+                setattr(self, name, section)
+                self._versions[name] = versions[name]
+            return list(changed)
+        raise SettingsConflict("Settings were changed by other requests while applying the patch.")
+
+    @settings_load_seconds.time()
     def load(self) -> bool:
-        """Load the configuration from the database."""
-        with session() as database_session:
+        """Load the configuration from the database, only the sections that changed since the last load."""
+        with read_session() as database_session:
             if environment.database_lazzy_loader:
                 return True
-            settings_from_database = database_session.query(SettingsORM).filter(SettingsORM.name == "global").first()
-            if not settings_from_database:
+            versions = dict(database_session.execute(settings_versions).all())
+            changed = [
+                name
+                for name, version in versions.items()
+                if name in type(self).model_fields and self._versions.get(name) != version
+            ]
+            if not changed:
+                settings_cache.inc("hit")
                 return True
-            loaded = json.loads(str(settings_from_database.data))
-            for key, value in loaded.items():
-                if hasattr(self, key):
-                    orm_model = self.__fields__[key].type_
-                    if issubclass(orm_model, BaseModel):
-                        setattr(self, key, orm_model(**value))
-                    else:
-                        setattr(self, key, value)
+            settings_cache.inc("miss")
+            for stored in database_session.execute(settings_by_names, {"names": changed}).scalars():
+                section = type(self).model_fields[stored.name].annotation
+                setattr(self, stored.name, section.model_validate_json(stored.data))  # type: ignore[union-attr]
+                self._versions[stored.name] = stored.version
             return True
 
     def reset(self) -> bool:
-        """Reset the configuration from the database."""
-        with session() as database_session:
-            # Query the database for the settings
-            settings_from_database = database_session.query(SettingsORM).filter(SettingsORM.name == "global").first()
-            # If the settings exist, update them
-            new_data = str(Settings().json())
-            if not settings_from_database:
-                database_session.add(SettingsORM(name="global", data=new_data))
-                database_session.commit()
-            else:
-                settings_from_database.data = new_data  # type: ignore
-                database_session.commit()
-            self.load()
-        return True
+        """Reset the configuration to the defaults, and save it to the database."""
+        for name, field in type(self).model_fields.items():
+            setattr(self, name, field.annotation())  # type: ignore[misc]
+        return self.save()
+
+
+class SettingsChange(BaseModel):
+    """A version of a settings section, in the history."""
+
+    version: int = Field(title="Version", description="Position of the change in the history, it only grows.")
+    section: str = Field(title="Section", description="Name of the settings section.")
+    section_version: int = Field(title="Section version", description="Version of the section after the change.")
+    data: dict[str, Any] = Field(title="Data", description="Values of the section after the change.")
+    changed_at: datetime = Field(title="Changed at", description="Time of the change, in UTC.")
+
+
+class SettingsHistory(BaseModel):
+    """Page of the settings history, newest first."""
+
+    records: list[SettingsChange]
+    next: int | None = Field(
+        default=None,
+        title="Next page",
+        description="Pass it as before to get the next page, it is null on the last page.",
+    )
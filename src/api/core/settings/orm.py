@@ -1,12 +1,71 @@
 """Settings ORM."""
-from sqlalchemy import Column, String
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, bindparam, insert, select, update
 
 from api.core.database import BaseModelORM
 
 
 class SettingsORM(BaseModelORM):
-    """Stores the configuration on the database."""
+    """Stores one section of the configuration on the database, the version is bumped on every change."""
 
     __tablename__ = "settings"
     name = Column(String(length=120), primary_key=True)
-    data = Column(String(length=16384))
+    data = Column(Text)
+    version = Column(Integer, nullable=False, default=1)
+
+
+class SettingsHistoryORM(BaseModelORM):
+    """Append only history of the configuration, one row for every version of every section."""
+
+    __tablename__ = "settingshistory"
+    __table_args__ = (
+        # Settings as of a time, the last change of a section before it
+        Index("ix_settingshistory_name_changed_at", "name", "changed_at"),
+        {"sqlite_autoincrement": True},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(length=120), nullable=False)
+    version = Column(Integer, nullable=False)
+    data = Column(Text)
+    changed_at = Column(DateTime, nullable=False)
+
+
+# Hot lookups, built once so each execution only binds the parameters and reuses the compiled statement.
+settings_versions = select(SettingsORM.name, SettingsORM.version)
+settings_by_names = select(SettingsORM).where(SettingsORM.name.in_(bindparam("names", expanding=True)))
+update_section = (
+    update(SettingsORM)
+    .where(SettingsORM.name == bindparam("section"))
+    .values(data=bindparam("section_data"), version=SettingsORM.version + 1)
+    .execution_options(synchronize_session=False)
+)
+# Same as update_section, only if the section still has the version the caller has read.
+swap_section = (
+    update(SettingsORM)
+    .where(SettingsORM.name == bindparam("section"), SettingsORM.version == bindparam("section_version"))
+    .values(data=bindparam("section_data"), version=SettingsORM.version + 1)
+    .execution_options(synchronize_session=False)
+)
+# Copy the current version of a section to the history.
+record_section = insert(SettingsHistoryORM.__table__).from_select(
+    ["name", "version", "data", "changed_at"],
+    select(SettingsORM.name, SettingsORM.version, SettingsORM.data, bindparam("changed_at", type_=DateTime())).where(
+        SettingsORM.name == bindparam("section")
+    ),
+)
+# Last version of a section at a time.
+section_at = (
+    select(SettingsHistoryORM)
+    .where(SettingsHistoryORM.name == bindparam("section"), SettingsHistoryORM.changed_at <= bindparam("time"))
+    .order_by(SettingsHistoryORM.changed_at.desc(), SettingsHistoryORM.id.desc())
+    .limit(1)
+)
+# Page of the history, newest first, from the change before a cursor, optionally of one section.
+history_page = (
+    select(SettingsHistoryORM)
+    .where(
+        SettingsHistoryORM.id < bindparam("before"),
+        bindparam("section", type_=String()).is_(None) | (SettingsHistoryORM.name == bindparam("section")),
+    )
+    .order_by(SettingsHistoryORM.id.desc())
+    .limit(bindparam("records"))
+)
@@ -1,7 +1,13 @@
 """Settings router."""
-from fastapi import APIRouter, HTTPException, status
+from datetime import datetime
+from typing import Annotated, Any
 
-from api.core.settings.model import RunningSettings
+from fastapi import APIRouter, Body, HTTPException, Query, status
+from fastapi.exceptions import RequestValidationError
+
+from api.core.logs.utils import audit_logger
+from api.core.settings.model import RunningSettings, Settings, SettingsConflict, SettingsHistory, SettingsInvalid
+from api.core.settings.utils import current_settings, running_settings, settings_at, settings_history
 
 router = APIRouter()
 
@@ -24,7 +30,7 @@ async def get_settings():
     Returns:
         RunningSettings: Application settings.
     """
-    return RunningSettings()
+    return current_settings()
 
 
 @router.patch(
@@ -33,26 +39,42 @@ async def get_settings():
     status_code=status.HTTP_200_OK,
     responses={
         200: {"description": "Successful Response."},
+        409: {"description": "Conflict: Settings were changed by other requests."},
+        422: {"description": "Unprocessable Entity: Unknown settings section or invalid value."},
         500: {"description": "Internal Server Error."},
     },
 )
-async def update_settings(settings_in: RunningSettings):
+def update_settings(patch: Annotated[dict[str, Any], Body()]):
     """
     Patch Settings.
 
-    Update the application settings.
+    Update the application settings with a JSON merge patch (RFC 7386).
+    Only the members in the patch are changed, members set to null go back to their default.
 
     Args:
-        settings_in (RunningSettings): Application settings.
+        patch (dict[str, Any]): JSON merge patch of the application settings.
 
     Returns:
         RunningSettings: Application settings.
     """
-    for item, value in settings_in.dict().items():
-        setattr(RunningSettings(), item, value)
-    if RunningSettings().save() is True:
-        return RunningSettings()
-    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+    settings = current_settings()
+    try:
+        changed = settings.merge(patch)
+    except SettingsInvalid as error:
+        raise RequestValidationError(
+            [{**detail, "loc": ("body", *detail["loc"])} for detail in error.errors]
+        ) from error
+    except SettingsConflict as error:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Conflict: Settings were changed by other requests.",
+        ) from error
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Not processed: {error}"
+        ) from error
+    audit_logger.info("Settings changed.", extra={"event": "settings", "action": "update", "sections": changed})
+    return settings
 
 
 @router.get(
@@ -64,7 +86,7 @@ async def update_settings(settings_in: RunningSettings):
         500: {"description": "Internal Server Error."},
     },
 )
-async def reset_settings():
+def reset_settings():
     """
     Reset Settings.
 
@@ -73,6 +95,89 @@ async def reset_settings():
     Returns:
         RunningSettings: Application settings.
     """
-    if RunningSettings().reset() is True:
-        return RunningSettings()
+    settings = current_settings()
+    if settings.reset() is True:
+        audit_logger.info("Settings reset.", extra={"event": "settings", "action": "reset"})
+        return settings
     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+
+
+@router.get(
+    "/history",
+    response_model=SettingsHistory,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Successful Response."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def get_settings_history(
+    before: Annotated[int | None, Query(description="Return the changes before this version.")] = None,
+    section: Annotated[str | None, Query(description="Return only the changes of this section.")] = None,
+    records: Annotated[int, Query(gt=0, description="Number of changes to return.")] = 100,
+):
+    """
+    Get Settings History.
+
+    Get the changes of the application settings, newest first.
+    Pages are read with a cursor, pass the next value of a page as before to get the following one.
+
+    Returns:
+        SettingsHistory: Page of the settings history.
+    """
+    return settings_history(before=before, section=section, records=min(records, running_settings.api.page_size_max))
+
+
+@router.get(
+    "/history/at",
+    response_model=Settings,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Successful Response."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def get_settings_at(time: Annotated[datetime, Query(description="Point in time, UTC if no offset is given.")]):
+    """
+    Get Settings At.
+
+    Get the application settings as they were at a point in time.
+
+    Returns:
+        Settings: Application settings at the time.
+    """
+    return settings_at(time)
+
+
+@router.post(
+    "/history/rollback",
+    response_model=RunningSettings,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Successful Response."},
+        409: {"description": "Conflict: Settings were changed by other requests."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def rollback_settings(time: Annotated[datetime, Query(description="Point in time, UTC if no offset is given.")]):
+    """
+    Rollback Settings.
+
+    Restore the application settings as they were at a point in time, the rollback is a new change in the history.
+
+    Returns:
+        RunningSettings: Application settings.
+    """
+    settings = current_settings()
+    try:
+        changed = settings.merge(settings_at(time).model_dump(mode="json"))
+    except SettingsConflict as error:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Conflict: Settings were changed by other requests.",
+        ) from error
+    audit_logger.info(
+        "Settings rolled back.",
+        extra={"event": "settings", "action": "rollback", "sections": changed, "as_of": time.isoformat()},
+    )
+    return settings
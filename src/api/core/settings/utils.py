@@ -1,19 +1,71 @@
 """Settings Utils Module."""
-from api.core.settings.model import RunningSettings, Settings
+import json
+from datetime import datetime, timezone
+
+from api.core.database import read_session
+from api.core.settings.model import RunningSettings, Settings, SettingsChange, SettingsHistory
+from api.core.settings.orm import history_page, section_at
+from api.core.state import StateProxy, get_state
 
 settings = Settings()
-running_settings = RunningSettings()
-# Load settings from database
-running_settings.load()
+
+
+def current_settings() -> RunningSettings:
+    """Return the running settings of the current application, creating them on the first call."""
+    state = get_state()
+    if state.settings is None:
+        with state.lock:
+            if state.settings is None:
+                state.settings = RunningSettings()
+    return state.settings
+
+
+# Running settings of the current application
+running_settings: RunningSettings = StateProxy(current_settings)  # type: ignore[assignment]
 
 
 def get_running_settings() -> RunningSettings:
     """Get the running settings."""
-    if RunningSettings().load() is False:
+    if current_settings().load() is False:
         raise ValueError("Settings not loaded")
-    return RunningSettings()
+    return current_settings()
 
 
 def get_settings() -> Settings:
     """Get the settings."""
     return Settings()
+
+
+def as_utc(time: datetime) -> datetime:
+    """Return a time as naive UTC, the way the history stores it."""
+    if time.tzinfo is None:
+        return time
+    return time.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def settings_history(before: int | None = None, section: str | None = None, records: int = 100) -> SettingsHistory:
+    """Return a page of the settings history, newest first, with the changes before a version."""
+    parameters = {"before": before if before is not None else 2**63 - 1, "section": section, "records": records}
+    with read_session() as database_session:
+        changes = [
+            SettingsChange(
+                version=change.id,
+                section=change.name,
+                section_version=change.version,
+                data=json.loads(str(change.data)),
+                changed_at=change.changed_at,
+            )
+            for change in database_session.execute(history_page, parameters).scalars()
+        ]
+    return SettingsHistory(records=changes, next=changes[-1].version if len(changes) == records else None)
+
+
+def settings_at(time: datetime) -> Settings:
+    """Return the settings as they were at a time, sections without history before it have their defaults."""
+    document = {}
+    with read_session() as database_session:
+        for name in Settings.model_fields:
+            change = database_session.execute(section_at, {"section": name, "time": as_utc(time)}).scalar_one_or_none()
+            if change is not None:
+                document[name] = json.loads(str(change.data))
+    return Settings.model_validate(document)
@@ -0,0 +1,112 @@
+"""Core State."""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from itertools import count
+from threading import Lock
+from typing import Any, Callable, Coroutine, Iterator
+
+from sqlalchemy import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.core.environment import Environment
+
+
+class AppState:
+    """
+    Resources owned by one application instance.
+
+    The engine, the running settings, the in memory revoked tokens and the background tasks live here,
+    so several applications can run isolated in the same process.
+    The application is ready when it finished warming up, and until it starts shutting down.
+    """
+
+    def __init__(self, environment: Environment) -> None:
+        """Create the state, resources are built on first use or on the application lifespan."""
+        self.environment = environment
+        self.engine: Engine | None = None
+        # Read replicas, the time until each failing one is left out, and the round robin cursor
+        self.replicas: list[Engine] | None = None
+        self.replicas_down: dict[int, float] = {}
+        self.replica_cursor = count()
+        self.settings: Any = None
+        # Expiration of each revoked token, by its 128 bit id
+        self.revoked_tokens: dict[bytes, datetime] = {}
+        # Token generation of each user by email, None if there is no such user, and the monotonic time it was read
+        self.token_generations: dict[str, tuple[int | None, float]] = {}
+        self.tasks: list[asyncio.Task] = []
+        self.lock = Lock()
+        self.ready = False
+
+    def start_task(self, coroutine: Coroutine[Any, Any, None]) -> asyncio.Task:
+        """Start a background task, it is cancelled when the application shuts down."""
+        task = asyncio.create_task(coroutine)
+        self.tasks.append(task)
+        return task
+
+    async def stop_tasks(self) -> None:
+        """Cancel the background tasks and wait for them."""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+
+# State of the application handling the current request.
+current_state: ContextVar[AppState | None] = ContextVar("current_state", default=None)
+
+
+@lru_cache(maxsize=None)
+def default_state() -> AppState:
+    """Return the state used outside of an application, built from the process environment."""
+    return AppState(Environment())
+
+
+def get_state() -> AppState:
+    """Return the state of the current application."""
+    state = current_state.get()
+    if state is None:
+        return default_state()
+    return state
+
+
+@contextmanager
+def use_state(state: AppState) -> Iterator[AppState]:
+    """Make a state the current one, inside the context."""
+    token = current_state.set(state)
+    try:
+        yield state
+    finally:
+        current_state.reset(token)
+
+
+class StateMiddleware:
+    """Make the application state the current one while handling a request."""
+
+    def __init__(self, app: ASGIApp, state: AppState) -> None:
+        """Wrap the application."""
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request."""
+        with use_state(self.state):
+            await self.app(scope, receive, send)
+
+
+class StateProxy:
+    """Forward attribute access to a resource of the current application."""
+
+    def __init__(self, resource: Callable[[], Any]) -> None:
+        """Create the proxy, resource returns the object of the current application."""
+        object.__setattr__(self, "_resource", resource)
+
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute from the resource."""
+        return getattr(self._resource(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute on the resource."""
+        setattr(self._resource(), name, value)
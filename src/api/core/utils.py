@@ -1,10 +1,12 @@
 """Core Utilities."""
 from api.core.environment import Environment
 from api.core.model import HashHandler, RandomGenerator
+from api.core.state import StateProxy, get_state
 
 generator = RandomGenerator()
 hash_handler = HashHandler()
-environment = Environment()
+# Environment of the current application
+environment: Environment = StateProxy(lambda: get_state().environment)  # type: ignore[assignment]
 
 
 def get_generator() -> RandomGenerator:
@@ -18,5 +20,5 @@ def get_hash_handler() -> HashHandler:
 
 
 def get_environment() -> Environment:
-    """Return a Environment instance."""
-    return Environment()
+    """Return the Environment of the current application."""
+    return get_state().environment
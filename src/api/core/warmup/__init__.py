@@ -0,0 +1 @@
+"""Warmup Module."""
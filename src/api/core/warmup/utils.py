@@ -0,0 +1,70 @@
+"""Warmup Utils."""
+import asyncio
+import logging
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from api.core.database import get_engine, get_replicas
+from api.core.jwt.utils import jwt_factory
+from api.core.profiler.startup import timed
+from api.core.state import get_state
+from api.core.utils import environment, generator, hash_handler
+
+logger = logging.getLogger(__name__)
+
+
+def open_connections(count: int) -> int:
+    """Open pooled database connections on the primary and the replicas, so the first requests find them ready."""
+    connections = [engine.connect() for engine in [get_engine(), *get_replicas()] for _ in range(count)]
+    for connection in connections:
+        connection.execute(text("SELECT 1"))
+    # Closing returns them to the pool, still open.
+    for connection in connections:
+        connection.close()
+    return len(connections)
+
+
+def hash_password() -> bool:
+    """Hash and verify a random password, to allocate the argon2 memory."""
+    password = generator.password()
+    return hash_handler.verify_hash(password=password, hash=hash_handler.generate_hash(password))
+
+
+def build_schemas(application: FastAPI) -> int:
+    """Build the OpenAPI schema and the JSON schema of every response model, and return the number of models."""
+    application.openapi()
+    models = {
+        route.response_model
+        for route in application.routes
+        if isinstance(route, APIRoute)
+        and isinstance(route.response_model, type)
+        and issubclass(route.response_model, BaseModel)
+    }
+    for model in models:
+        model.model_json_schema()
+    return len(models)
+
+
+async def warmup(application: FastAPI) -> None:
+    """
+    Warm the application up, and then report it as ready.
+
+    Readiness stays False until every step finishes, so load balancers only send traffic to warm instances.
+    A failing step is logged and skipped, the instance is still reported ready, only colder.
+    """
+    steps = (
+        ("database connections", open_connections, environment.warmup_connections),
+        ("password hash", hash_password),
+        ("schemas", build_schemas, application),
+        ("revoked tokens", jwt_factory.purge),
+    )
+    for name, step, *arguments in steps:
+        try:
+            with timed("warmup " + name):
+                await asyncio.to_thread(step, *arguments)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Warmup of the %s failed.", name)
+    get_state().ready = True
@@ -1,64 +1,184 @@
 """Main module for the API."""
+import argparse
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from fastapi import APIRouter, FastAPI
 
 from api.about.router import router as about_router
 from api.auth.router import router as auth_router
-from api.core.constants import app_start_parameters
+from api.core.compression.middleware import CompressionMiddleware
+from api.core.constants import app_name, app_start_parameters
+from api.core.database import StickyReadsMiddleware
+from api.core.database import initialize as initialize_database
 from api.core.database import reset as reset_database
 from api.core.database import shutdown as shutdown_database
 from api.core.database import test as test_database
+from api.core.environment import Environment
 from api.core.healthcheck.router import router as healthcheck_router
+from api.core.jwt.utils import purge_revoked_tokens
+from api.core.logs.middleware import AccessLogMiddleware
+from api.core.logs.utils import log_writer
+from api.core.metrics.middleware import MetricsMiddleware, QueryBudgetMiddleware
+from api.core.metrics.router import router as metrics_router
+from api.core.profiler.middleware import ProfilerMiddleware
+from api.core.profiler.router import router as profiler_router
+from api.core.profiler.startup import profile_startup, timed
 from api.core.settings.router import router as settings_router
+from api.core.settings.utils import running_settings
+from api.core.state import AppState, StateMiddleware, default_state, use_state
 from api.core.utils import environment
+from api.core.warmup.utils import warmup
 from api.users.router import router as user_router
 
-# Create FastAPI instance
-app = FastAPI(**app_start_parameters)
+logger = logging.getLogger(__name__)
+
+
+def create_app(config: Environment | None = None) -> FastAPI:
+    """
+    Create an application.
+
+    Every application owns its engine, running settings, revoked tokens and background tasks,
+    they are created on the application lifespan and released on shutdown.
+
+    Args:
+        config (Environment | None, optional): Application environment. Defaults to the process environment.
+
+    Returns:
+        FastAPI: The application.
+    """
+    state = default_state() if config is None else AppState(config)
 
+    @asynccontextmanager
+    async def lifespan(started: FastAPI) -> AsyncIterator[None]:
+        """Startup and shutdown the application resources."""
+        with use_state(state):
+            log_writer.start(state.environment.log_level)
+            # Reset the database if debug, otherwise upgrade its schema
+            if environment.behavior.is_debug:
+                with timed("database reset"):
+                    reset_database()
+            else:
+                with timed("database migrations"):
+                    initialize_database()
+            # Test the database connection, raise error if not possible.
+            with timed("database connection"):
+                if not test_database():
+                    raise ValueError("Database connection failed")
+            # Finish Lazzy Loader
+            environment.database_lazzy_loader = False
+            # Load settings from database
+            with timed("settings load"):
+                running_settings.load()
+            # Every worker keeps its own memory store, a token revoked on one is still accepted by the others
+            if state.environment.server_workers > 1 and running_settings.jwt.jwt_revokes_store == "memory":
+                logger.warning("Revoked tokens are kept in memory by each of the workers, use the database store.")
+            # Start the background tasks, the application is ready once warmed up
+            state.start_task(warmup(started))
+            state.start_task(purge_revoked_tokens())
+            try:
+                yield
+            finally:
+                state.ready = False
+                await state.stop_tasks()
+                shutdown_database()
+                log_writer.stop()
 
-# On Startup event
-@app.on_event("startup")
-async def startup() -> None:
-    """Triggered when the application is starting up."""
-    # Check if the environment is initialized
-    if environment is None:
-        raise ValueError("Environment not initialized")
-    # Initialize the database, if debug
-    if environment.behavior.is_debug:
-        # Reset the database
-        reset_database()
-    # Test the database connection, raise error if not possible.
-    if not test_database():
-        raise ValueError("Database connection failed")
-    # Finish Lazzy Loader
-    environment.database_lazzy_loader = False
+    # Create FastAPI instance
+    application = FastAPI(lifespan=lifespan, **app_start_parameters(state.environment))
+    # Reach the resources from outside requests, like tests and scripts
+    application.state.app_state = state
+    application.add_middleware(
+        CompressionMiddleware, precompressed_paths=[application.openapi_url] if application.openapi_url else []
+    )
+    profiling = state.environment.behavior.is_debug or state.environment.profiler_enabled
+    if profiling:
+        application.add_middleware(ProfilerMiddleware)
+    if state.environment.metrics_enabled:
+        application.add_middleware(MetricsMiddleware)
+    # Log every request, only a sample of the high volume ones.
+    application.add_middleware(
+        AccessLogMiddleware,
+        sampled_paths=["/healthcheck/", "/healthcheck/ready", "/metrics"],
+        sample_rate=state.environment.log_sample_rate,
+    )
+    # Count the queries of each request, shown on Server-Timing out of production.
+    application.add_middleware(
+        QueryBudgetMiddleware,
+        budget=state.environment.query_budget,
+        server_timing=state.environment.behavior.is_debug,
+        strict=state.environment.behavior.is_testing,
+    )
+    # Read your writes, when reads are spread over replicas.
+    if state.environment.database_replica_urls:
+        application.add_middleware(StickyReadsMiddleware)
+    # Make the application state current for every request, it must be the outermost middleware.
+    application.add_middleware(StateMiddleware, state=state)
 
+    # Assigning endpoints
+    application.include_router(prefix="/about", tags=["About"], router=about_router)
+    application.include_router(prefix="/auth", tags=["Auth"], router=auth_router)
+    admin = APIRouter(tags=["Admin"])
+    admin.include_router(prefix="/users", router=user_router)
+    admin.include_router(prefix="/settings", router=settings_router)
+    if profiling:
+        admin.include_router(prefix="/profiler", router=profiler_router)
 
-# On Shutdown event
-@app.on_event("shutdown")
-async def shutdown() -> None:
-    """Triggered when the application is shutting down."""
-    shutdown_database()
+    application.include_router(prefix="/admin", router=admin)
+    application.include_router(prefix="/healthcheck", tags=["Healthcheck"], router=healthcheck_router)
+    if state.environment.metrics_enabled:
+        application.include_router(prefix="/metrics", tags=["Metrics"], router=metrics_router)
+    return application
 
 
-# Assigning endpoints
-app.include_router(prefix="/about", tags=["About"], router=about_router)
-app.include_router(prefix="/auth", tags=["Auth"], router=auth_router)
-admin = APIRouter(tags=["Admin"])
-admin.include_router(prefix="/users", router=user_router)
-admin.include_router(prefix="/settings", router=settings_router)
+app = create_app()
 
-app.include_router(prefix="/admin", router=admin)
-app.include_router(prefix="/healthcheck", tags=["Healthcheck"], router=healthcheck_router)
+
+def server_options(config: Environment) -> dict[str, Any]:
+    """
+    Return the uvicorn options for an environment.
+
+    Every worker imports the application and warms it up on its own lifespan, before accepting connections.
+
+    Args:
+        config (Environment): Application environment.
+
+    Returns:
+        dict[str, Any]: Keyword arguments for uvicorn.run.
+    """
+    return {
+        "app": "api.main:app",
+        "host": config.server_host,
+        "port": config.server_port,
+        "workers": config.server_workers,
+        "loop": config.server_loop,
+        "http": config.server_http,
+        "backlog": config.server_backlog,
+        "timeout_keep_alive": config.server_keep_alive,
+        "timeout_graceful_shutdown": config.server_graceful_shutdown,
+        "proxy_headers": True,
+        "server_header": False,
+    }
 
 
 # Run the application if the file is executed directly
 def run() -> None:
-    """Run the application, only for development."""
+    """Run the application, with the server options from the environment."""
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+
+    uvicorn.run(**server_options(environment))
 
 
 if __name__ == "__main__":
-    # Run the application
-    run()
+    parser = argparse.ArgumentParser(description="API for the " + app_name + " application.")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report the import and initialization time of each module, and exit.",
+    )
+    if parser.parse_args().profile_startup:
+        print(profile_startup())  # noqa: T201
+    else:
+        # Run the application
+        run()
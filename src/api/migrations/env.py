@@ -0,0 +1,45 @@
+"""Migrations Environment."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from api.core.database import BaseModelORM, get_engine
+from api.core.jwt.orm import RevokedTokenORM  # noqa: F401 pylint: disable=unused-import
+from api.core.settings.orm import SettingsORM  # noqa: F401 pylint: disable=unused-import
+from api.users.orm import UserORM  # noqa: F401 pylint: disable=unused-import
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline() -> None:
+    """Write the migrations as SQL, without connecting to the database."""
+    context.configure(
+        url=str(get_engine().url),
+        target_metadata=BaseModelORM.metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations on the connection given by the caller, or on the engine of the environment."""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        with get_engine().connect() as connection:
+            context.configure(connection=connection, target_metadata=BaseModelORM.metadata, render_as_batch=True)
+            with context.begin_transaction():
+                context.run_migrations()
+        return
+    context.configure(connection=connection, target_metadata=BaseModelORM.metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,60 @@
+"""Initial schema, as created by create_all before migrations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    op.create_table(
+        "users",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("name", sa.String(length=128), nullable=True),
+        sa.Column("username", sa.String(length=64), nullable=True),
+        sa.Column("email", sa.String(length=256), nullable=True),
+        sa.Column("active", sa.Boolean(), nullable=True),
+        sa.Column("blocked", sa.Boolean(), nullable=True),
+        sa.Column("verified", sa.Boolean(), nullable=True),
+        sa.Column("password_hash", sa.String(length=128), nullable=True),
+        sa.Column("password_strikes", sa.Integer(), nullable=True),
+        sa.Column("password_birthday", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_users_key", "users", ["key"])
+    op.create_index("ix_users_name", "users", ["name"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_table(
+        "revokedtokens",
+        sa.Column("token", sa.String(length=60), nullable=False),
+        sa.Column("expiration", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("token"),
+    )
+    op.create_index("ix_revokedtokens_token", "revokedtokens", ["token"])
+    op.create_table(
+        "settings",
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("data", sa.String(length=16384), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    op.drop_table("settings")
+    op.drop_index("ix_revokedtokens_token", table_name="revokedtokens")
+    op.drop_table("revokedtokens")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_index("ix_users_name", table_name="users")
+    op.drop_index("ix_users_key", table_name="users")
+    op.drop_table("users")
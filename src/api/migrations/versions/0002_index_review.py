@@ -0,0 +1,34 @@
+"""Index review, keep only the indexes the queries use.
+
+Users are read by key, the primary key, and by username or email, on login and on creation checks.
+Pages are sorted by the primary key. Revoked tokens are read by token, the primary key, and purged by expiration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    # Duplicates of the primary keys
+    op.drop_index("ix_users_key", table_name="users")
+    op.drop_index("ix_revokedtokens_token", table_name="revokedtokens")
+    # No query filters or sorts by name
+    op.drop_index("ix_users_name", table_name="users")
+    # Purge of the expired revoked tokens
+    op.create_index("ix_revokedtokens_expiration", "revokedtokens", ["expiration"])
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    op.drop_index("ix_revokedtokens_expiration", table_name="revokedtokens")
+    op.create_index("ix_users_name", "users", ["name"])
+    op.create_index("ix_revokedtokens_token", "revokedtokens", ["token"])
+    op.create_index("ix_users_key", "users", ["key"])
@@ -0,0 +1,51 @@
+"""Settings stored by section, each with its own version.
+
+The global document is split into one row per section, so a change rewrites only its section,
+and a reload fetches and validates only the sections whose version changed.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+import json
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+settings = sa.table(
+    "settings",
+    sa.column("name", sa.String),
+    sa.column("data", sa.Text),
+    sa.column("version", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    with op.batch_alter_table("settings") as batch:
+        batch.alter_column("data", type_=sa.Text(), existing_type=sa.String(length=16384))
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    connection = op.get_bind()
+    document = connection.execute(sa.select(settings.c.data).where(settings.c.name == "global")).scalar()
+    if document is not None:
+        connection.execute(settings.delete().where(settings.c.name == "global"))
+        for name, section in json.loads(document).items():
+            connection.execute(settings.insert().values(name=name, data=json.dumps(section), version=1))
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    connection = op.get_bind()
+    sections = connection.execute(sa.select(settings.c.name, settings.c.data)).all()
+    if sections:
+        document = {name: json.loads(data) for name, data in sections}
+        connection.execute(settings.delete())
+        connection.execute(settings.insert().values(name="global", data=json.dumps(document), version=1))
+    with op.batch_alter_table("settings") as batch:
+        batch.drop_column("version")
+        batch.alter_column("data", type_=sa.String(length=16384), existing_type=sa.Text())
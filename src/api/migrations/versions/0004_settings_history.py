@@ -0,0 +1,45 @@
+"""Append only settings history.
+
+Every version of every settings section is kept, with the time of the change,
+indexed by section and time to read the settings as of a point in time.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    history = op.create_table(
+        "settingshistory",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("data", sa.Text(), nullable=True),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_settingshistory_name_changed_at", "settingshistory", ["name", "changed_at"])
+    # The history starts with the current settings
+    settings = sa.table("settings", sa.column("name"), sa.column("version"), sa.column("data"))
+    connection = op.get_bind()
+    now = datetime.utcnow()
+    for name, version, data in connection.execute(sa.select(settings.c.name, settings.c.version, settings.c.data)):
+        connection.execute(history.insert().values(name=name, version=version, data=data, changed_at=now))
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    op.drop_index("ix_settingshistory_name_changed_at", table_name="settingshistory")
+    op.drop_table("settingshistory")
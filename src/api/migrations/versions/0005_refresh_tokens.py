@@ -0,0 +1,36 @@
+"""Refresh tokens, stored hashed with their family.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    op.create_table(
+        "refreshtokens",
+        sa.Column("token_hash", sa.String(length=64), nullable=False),
+        sa.Column("family", sa.String(length=64), nullable=False),
+        sa.Column("subject", sa.String(length=256), nullable=False),
+        sa.Column("expiration", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("token_hash"),
+    )
+    # Revoke a family on reuse, and purge the expired tokens
+    op.create_index("ix_refreshtokens_family", "refreshtokens", ["family"])
+    op.create_index("ix_refreshtokens_expiration", "refreshtokens", ["expiration"])
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    op.drop_index("ix_refreshtokens_expiration", table_name="refreshtokens")
+    op.drop_index("ix_refreshtokens_family", table_name="refreshtokens")
+    op.drop_table("refreshtokens")
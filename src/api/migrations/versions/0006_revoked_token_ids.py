@@ -0,0 +1,54 @@
+"""Revoked tokens keyed by their 128 bit id, instead of the raw token.
+
+Tokens carry a jti claim, revoked tokens are stored by it, in a fixed width binary key.
+Tokens revoked before have no jti, they are keyed by the first 128 bits of their SHA-256 digest,
+the same id the application computes for tokens without a jti.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from hashlib import sha256
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    connection = op.get_bind()
+    revoked = connection.execute(sa.text("SELECT token, expiration FROM revokedtokens")).all()
+    op.drop_index("ix_revokedtokens_expiration", table_name="revokedtokens")
+    op.drop_table("revokedtokens")
+    op.create_table(
+        "revokedtokens",
+        sa.Column("jti", sa.LargeBinary(length=16), nullable=False),
+        sa.Column("expiration", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("jti"),
+    )
+    op.create_index("ix_revokedtokens_expiration", "revokedtokens", ["expiration"])
+    if revoked:
+        # Untyped columns, the expiration is copied as stored
+        table = sa.table("revokedtokens", sa.column("jti"), sa.column("expiration"))
+        connection.execute(
+            table.insert(),
+            [{"jti": sha256(token.encode()).digest()[:16], "expiration": expiration} for token, expiration in revoked],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade the schema, the revoked tokens can not be restored from their ids and are dropped."""
+    op.drop_index("ix_revokedtokens_expiration", table_name="revokedtokens")
+    op.drop_table("revokedtokens")
+    op.create_table(
+        "revokedtokens",
+        sa.Column("token", sa.String(length=60), nullable=False),
+        sa.Column("expiration", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("token"),
+    )
+    op.create_index("ix_revokedtokens_expiration", "revokedtokens", ["expiration"])
@@ -0,0 +1,33 @@
+"""Token generation of each user, to revoke every token of a user at once.
+
+Access and refresh tokens carry the generation of their user when they were issued,
+bumping it invalidates all of them with a single update.
+Existing users and refresh tokens start at generation 0, the one tokens without it are read as.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("token_generation", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("refreshtokens") as batch:
+        batch.add_column(sa.Column("generation", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    with op.batch_alter_table("refreshtokens") as batch:
+        batch.drop_column("generation")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("token_generation")
@@ -0,0 +1,37 @@
+"""Version of each user, for the optimistic concurrency of the updates.
+
+The column came with the user versions, before the schema was managed by migrations, so it was created by
+create_all and never had a migration of its own. Databases are stamped with the baseline, 0001, whatever
+create_all built them, so some have the column and some do not, and it is only added when missing:
+
+- created before the user versions: no column, it is added here;
+- created by create_all after them, and stamped with 0001: the column is there already;
+- migrated while 0001 still created the column: the column is there already.
+
+Existing users start at version 1.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade the schema."""
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("users")}
+    if "version" not in columns:
+        with op.batch_alter_table("users") as batch:
+            batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    """Downgrade the schema."""
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("version")
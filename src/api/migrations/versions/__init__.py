@@ -0,0 +1 @@
+"""Migration Versions."""
@@ -2,67 +2,41 @@
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 from api.core.paginator.model import PageBase
-from api.core.settings.model import RunningSettings
+from api.core.settings.utils import running_settings
 from api.core.utils import generator
+from api.users.settings import PasswordChecker
 
 
 class Password(BaseModel):
     """User input model."""
 
     password: str = Field(
-        example="P@ssw0rd",
+        examples=["P@ssw0rd"],
         title="Password",
         description="User password, it comply with the password policy.",
     )
 
-    @validator("password")
+    @field_validator("password")
+    @classmethod
     def passwords_match(cls, value):
         """Validate password policy."""
-        if RunningSettings().users.password_policy.active:
-            min_length = RunningSettings().users.password_policy.min_length
-            max_length = RunningSettings().users.password_policy.max_length
-            min_upper = RunningSettings().users.password_policy.min_upper
-            min_lower = RunningSettings().users.password_policy.min_lower
-            min_digits = RunningSettings().users.password_policy.min_digits
-            min_special = RunningSettings().users.password_policy.min_special
-
-            if len(value) < min_length:
-                raise ValueError(f"Password must have at least {min_length} characters")
-
-            if len(value) > max_length:
-                raise ValueError(f"Password must have at most {max_length} characters")
-
-            if min_upper > 0:
-                if sum(1 for caracter in value if caracter.isupper()) < min_upper:
-                    raise ValueError(f"Password must have at least {min_upper} uppercase letters")
-
-            if min_lower > 0:
-                if sum(1 for caracter in value if caracter.islower()) < min_lower:
-                    raise ValueError(f"Password must have at least {min_lower} lowercase letters")
-
-            if min_digits > 0:
-                if sum(1 for caracter in value if caracter.isdigit()) < min_digits:
-                    raise ValueError(f"Password must have at least {min_digits} digits")
-
-            if min_special > 0:
-                if sum(1 for caracter in value if not caracter.isalnum()) < min_special:
-                    raise ValueError(f"Password must have at least {min_special} special characters")
+        violations = PasswordChecker.compile(running_settings.users.password_policy).violations(value)
+        if violations:
+            raise ValueError("; ".join(violations))
         return value
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
-
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserBase(BaseModel):
     """User BaseModelORM model."""
 
     username: str = Field(
-        example="johndoe",
+        examples=["johndoe"],
         title="Username",
         description=(
             "User username, it must be unique, bigger than 5 and smaller than 64 characters"
@@ -70,19 +44,20 @@ class UserBase(BaseModel):
         ),
     )
     name: str = Field(
-        example="John Doe",
+        examples=["John Doe"],
         title="Full name",
         description=(
             "User full name, it must contain a space character, bigger than 5 and smaller " "than 128 characters."
         ),
     )
     email: EmailStr = Field(
-        example="john.doe@example.com",
+        examples=["john.doe@example.com"],
         title="Email",
         description="It can be an email binded to another account.",
     )
 
-    @validator("name")
+    @field_validator("name")
+    @classmethod
     def name_must_contain_space(cls, value):
         """Validate property."""
         if " " not in value:
@@ -93,7 +68,8 @@ class UserBase(BaseModel):
             raise ValueError("length must be less than 128")
         return value.title()
 
-    @validator("username")
+    @field_validator("username")
+    @classmethod
     def username_must_contain_space(cls, value):
         """Validate property."""
         if " " in value:
@@ -104,93 +80,112 @@ class UserBase(BaseModel):
             raise ValueError("length must be less than 64")
         return value.lower()
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
-
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserIn(UserBase, Password):
     """User input model."""
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
-
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserOut(UserBase):
     """User output model."""
 
     key: str = Field(
-        example="280e686cf0c3f5d5a86aff3ca12020c923adc6c92",
+        examples=["280e686cf0c3f5d5a86aff3ca12020c923adc6c92"],
         title="Key",
         description="User key, it is a unique identifier.",
     )
-    active: bool = Field(example=True, title="Active", description="User active status.")
-    blocked: bool = Field(example=False, title="Blocked", description="User blocked status.")
-    verified: bool = Field(example=False, title="Verified", description="User verified status.")
-    password_strikes: int = Field(example=0, title="Password Strikes", description="User password strikes.")
+    active: bool = Field(examples=[True], title="Active", description="User active status.")
+    blocked: bool = Field(examples=[False], title="Blocked", description="User blocked status.")
+    verified: bool = Field(examples=[False], title="Verified", description="User verified status.")
+    password_strikes: int = Field(examples=[0], title="Password Strikes", description="User password strikes.")
     password_birthday: datetime = Field(
-        example="2021-01-01 00:00:00",
+        examples=["2021-01-01 00:00:00"],
         title="Password Setting Date",
         description="User password setting date.",
     )
+    version: int = Field(examples=[1], title="Version", description="User version, it changes on every update.")
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
-        orm_mode = True
+
+class UserUpdate(UserBase):
+    """User update model."""
+
+    version: int | None = Field(
+        default=None,
+        examples=[1],
+        title="Version",
+        description="Version of the user that was read, if it changed meanwhile the update is rejected.",
+    )
+
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserDB(UserBase):
     """User database model."""
 
     key: str = Field(
-        default=generator.uuid(),
-        example="280e686cf0c3f5d5a86aff3ca12020c923adc6c92",
+        default_factory=generator.uuid,
+        examples=["280e686cf0c3f5d5a86aff3ca12020c923adc6c92"],
         title="Key",
         description="User key, it is a unique identifier.",
     )
     active: bool = Field(
-        default=RunningSettings().users.default_active,
-        example=True,
+        default_factory=lambda: running_settings.users.default_active,
+        examples=[True],
         title="Active",
         description="User active status.",
     )
     blocked: bool = Field(
-        default=RunningSettings().users.default_blocked,
-        example=False,
+        default_factory=lambda: running_settings.users.default_blocked,
+        examples=[False],
         title="Blocked",
         description="User blocked status.",
     )
     verified: bool = Field(
-        default=RunningSettings().users.default_verified,
-        example=False,
+        default_factory=lambda: running_settings.users.default_verified,
+        examples=[False],
         title="Verified",
         description="User verified status.",
     )
     password_hash: str = Field(
-        example="argon2id$v=19$m=65536,t=3,p=4$sC2MrzQvIT5v0reVS4eK5A$bLBwdKS2uMME7MF9ln06cGrEtiLK294YtQz8t44wcKw",
+        examples=["argon2id$v=19$m=65536,t=3,p=4$sC2MrzQvIT5v0reVS4eK5A$bLBwdKS2uMME7MF9ln06cGrEtiLK294YtQz8t44wcKw"],
         title="Password Hash",
         description="User password hash, used to authenticate localy.",
     )
     password_strikes: int = Field(
         default=0,
-        example=0,
+        examples=[0],
         title="Password Strikes",
         description="User password strikes.",
     )
     password_birthday: datetime = Field(
-        default=generator.now(),
-        example="2021-01-01 00:00:00",
+        default_factory=generator.now,
+        examples=["2021-01-01 00:00:00"],
         title="Password Setting Date",
     )
+    version: int = Field(
+        default=1,
+        examples=[1],
+        title="Version",
+        description="User version, it changes on every update.",
+    )
+    token_generation: int = Field(
+        default=0,
+        examples=[0],
+        title="Token generation",
+        description="Generation of the user tokens, it is bumped to invalidate all of them.",
+    )
 
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
-
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PageUserOut(PageBase):
@@ -1,5 +1,5 @@
 """User ORM."""
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, bindparam, select, update
 
 from api.core.database import BaseModelORM
 
@@ -10,8 +10,8 @@ class UserORM(BaseModelORM):
     __tablename__ = "users"
     __table_args__ = {"extend_existing": True}
 
-    key = Column(String(64), index=True, primary_key=True)
-    name = Column(String(128), index=True, nullable=True)
+    key = Column(String(64), primary_key=True)
+    name = Column(String(128), nullable=True)
     username = Column(String(64), index=True, unique=True)
     email = Column(String(256), index=True, unique=True)
     active = Column(Boolean)
@@ -20,3 +20,22 @@ class UserORM(BaseModelORM):
     password_hash = Column(String(128), nullable=True)
     password_strikes = Column(Integer, default=0)
     password_birthday = Column(DateTime(timezone=True))
+    version = Column(Integer, nullable=False, default=1)
+    # Tokens carry the generation they were issued for, bumping it invalidates all of them
+    token_generation = Column(Integer, nullable=False, default=0)
+
+    # Optimistic concurrency, every UPDATE/DELETE is issued as "WHERE key = ? AND version = ?"
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Hot lookups, built once so each execution only binds the parameters and reuses the compiled statement.
+user_by_key = select(UserORM).where(UserORM.key == bindparam("key"))
+user_by_email = select(UserORM).where(UserORM.email == bindparam("email"))
+user_by_username = select(UserORM).where(UserORM.username == bindparam("username"))
+user_token_generation = select(UserORM.token_generation).where(UserORM.email == bindparam("email"))
+bump_token_generation = (
+    update(UserORM)
+    .where(UserORM.email == bindparam("user_email"))
+    .values(token_generation=UserORM.token_generation + 1, version=UserORM.version + 1)
+    .execution_options(synchronize_session=False)
+)
@@ -1,10 +1,13 @@
 """User Router."""
 from fastapi import APIRouter, HTTPException, status
 
-from api.core.dependencies import Database, Generator, HashManager, QueryParameters, Settings
-from api.core.paginator.utils import executor
-from api.users.model import PageUserOut, UserBase, UserDB, UserIn, UserOut
-from api.users.orm import UserORM
+from api.core.dependencies import Database, Generator, HashManager, QueryParameters, ReadDatabase, Settings
+from api.core.model import SimpleMessage
+from api.core.paginator.utils import executor_response
+from api.core.state import get_state
+from api.users.model import PageUserOut, UserDB, UserIn, UserOut, UserUpdate
+from api.users.orm import UserORM, user_by_email, user_by_key, user_by_username
+from api.users.utils import compare_and_swap, revoke_all_tokens
 
 router = APIRouter()
 
@@ -26,8 +29,7 @@ def get_users(
 
     This method return a list of all users, paginated according to the query parameters.
     """
-    return executor(orm=UserORM, query=query, schema=UserDB)  # type: ignore[arg-type]
-    # MyPy is not recognizing herance from PageBase
+    return executor_response(orm=UserORM, query=query, schema=UserOut)
 
 
 @router.get(
@@ -40,14 +42,14 @@ def get_users(
         500: {"description": "Internal Server Error."},
     },
 )
-def get_user(key: str, database: Database):
+def get_user(key: str, database: ReadDatabase):
     """
     Get a user.
 
     This method return details of a idenfied user by the user's key.
     """
     # Check if user exists.
-    user_from_database = database.query(UserORM).filter(UserORM.key == key).first()
+    user_from_database = database.execute(user_by_key, {"key": key}).scalar_one_or_none()
     if not user_from_database:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found.")
     # Return user.
@@ -71,14 +73,14 @@ def create_user(user_in: UserIn, database: Database, generator: Generator, hash_
     This method create a new user.
     """
     # Check if a user with the same email exists.
-    user_in_db = database.query(UserORM).filter(UserORM.email == user_in.email).first()
+    user_in_db = database.execute(user_by_email, {"email": user_in.email}).scalar_one_or_none()
     if user_in_db is not None:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Not processed: Email already exists.",
         )
     # Check if a user with the same username exists.
-    user_in_db = database.query(UserORM).filter(UserORM.username == user_in.username).first()
+    user_in_db = database.execute(user_by_username, {"username": user_in.username}).scalar_one_or_none()
     if user_in_db is not None:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -88,9 +90,9 @@ def create_user(user_in: UserIn, database: Database, generator: Generator, hash_
     key = generator.uuid()
     password_hash = hash_handler.generate_hash(user_in.password)
     # Validate Model
-    new_user = UserDB(**user_in.dict(), password_hash=password_hash, key=key)
+    new_user = UserDB(**user_in.model_dump(), password_hash=password_hash, key=key)
     # Convert to ORM and save.
-    database.add(UserORM(**new_user.dict()))
+    database.add(UserORM(**new_user.model_dump()))
     database.commit()
     return new_user
 
@@ -102,26 +104,66 @@ def create_user(user_in: UserIn, database: Database, generator: Generator, hash_
     responses={
         200: {"description": "Successful Response."},
         404: {"description": "Not Found: User not found."},
+        409: {"description": "Conflict: User was changed by another request."},
         500: {"description": "Internal Server Error."},
     },
 )
-def update_user(user_in: UserBase, key: str, database: Database):
+def update_user(user_in: UserUpdate, key: str, database: Database):
     """
     Update a user.
 
     This method update a user.
+    If a version is informed and the user was changed since it was read, a 409 status code is returned.
     """
     # Check if user exists.
-    user_from_database = database.query(UserORM).filter(UserORM.key == key).first()
+    user_from_database = database.execute(user_by_key, {"key": key}).scalar_one_or_none()
     if user_from_database is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found.")
-    # Update user.
-    for item, value in user_in.dict(exclude_unset=True).items():
-        setattr(user_from_database, item, value)
+    # Update user, only if nobody else did it meanwhile.
+    version = user_in.version if user_in.version is not None else user_from_database.version
+    # Tokens are cached by the email they were issued to, read it before the update
+    email = user_from_database.email
+    changes = user_in.model_dump(exclude_unset=True, exclude={"version"})
+    # Users login with their username or email, the tokens issued before either changed are invalidated
+    identity = {name: value for name, value in changes.items() if name in ("username", "email")}
+    if any(value != getattr(user_from_database, name) for name, value in identity.items()):
+        changes["token_generation"] = UserORM.token_generation + 1
+    if not compare_and_swap(database, key=key, version=version, **changes):  # type: ignore[arg-type]
+        database.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Conflict: User was changed by another request.",
+        )
     database.commit()
+    get_state().token_generations.pop(email, None)
+    database.refresh(user_from_database)
     return user_from_database
 
 
+@router.post(
+    "/{key}/logout",
+    response_model=SimpleMessage,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Successful Response."},
+        404: {"description": "Not Found: User not found."},
+        500: {"description": "Internal Server Error."},
+    },
+)
+def logout_user(key: str, database: Database):
+    """
+    Logout a user from every session.
+
+    This method invalidates every access and refresh token issued to the user, with a single update.
+    """
+    user_from_database = database.execute(user_by_key, {"key": key}).scalar_one_or_none()
+    if user_from_database is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found.")
+    revoke_all_tokens(database, email=user_from_database.email)
+    database.commit()
+    return SimpleMessage(status="Logout successful.")
+
+
 @router.delete(
     "/{key}",
     response_model=UserOut,
@@ -147,10 +189,11 @@ def delete_user(key: str, database: Database, settings: Settings):
             detail="Not processed: User deletion is not allowed.",
         )
     # Check if user exists.
-    user_from_database = database.query(UserORM).filter(UserORM.key == key).first()
+    user_from_database = database.execute(user_by_key, {"key": key}).scalar_one_or_none()
     if user_from_database is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found.")
     # Delete user.
     database.delete(user_from_database)
     database.commit()
+    get_state().token_generations.pop(user_from_database.email, None)
     return user_from_database
@@ -1,7 +1,5 @@
 """User Settings."""
-from pydantic import BaseModel, Field, root_validator
-
-from api.core.model import Singleton
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class PasswordPolicy(BaseModel):
@@ -43,43 +41,112 @@ class PasswordPolicy(BaseModel):
         default=1,
     )
 
-    @root_validator
-    def password_policy_validator(cls, properties):
+    @model_validator(mode="after")
+    def password_policy_validator(self):
         """Validate password policy."""
-        if properties["min_upper"] < 0:
+        if self.min_upper < 0:
             raise ValueError("min_upper must be greater than or equal to 0")
-        if properties["min_lower"] < 0:
+        if self.min_lower < 0:
             raise ValueError("min_lower must be greater than or equal to 0")
-        if properties["min_digits"] < 0:
+        if self.min_digits < 0:
             raise ValueError("min_digits must be greater than or equal to 0")
-        if properties["min_special"] < 0:
+        if self.min_special < 0:
             raise ValueError("min_special must be greater than or equal to 0")
-        if properties["min_length"] < 0:
+        if self.min_length < 0:
             raise ValueError("min_length must be greater than or equal to 0")
-        if properties["max_length"] < 0:
+        if self.max_length < 0:
             raise ValueError("max_length must be greater than or equal to 0")
-        if properties["min_length"] > properties["max_length"]:
+        if self.min_length > self.max_length:
             raise ValueError("min_length must be less than or equal to max_length")
-        if (
-            properties["min_upper"] + properties["min_lower"] + properties["min_digits"] + properties["min_special"]
-        ) > properties["min_length"]:
+        if (self.min_upper + self.min_lower + self.min_digits + self.min_special) > self.min_length:
             raise ValueError(
                 "min_length must be more or equal to the sum of min_upper, min_lower, min_digits and min_special"
             )
-        if properties["max_length"] > 128:
+        if self.max_length > 128:
             raise ValueError("max_length must be less than or equal to 128")
-        return properties
-
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
+        return self
 
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
-class RunningPasswordPolicy(PasswordPolicy, Singleton):
+class RunningPasswordPolicy(PasswordPolicy):
     """Running Password Policy."""
 
 
+class PasswordChecker:
+    """
+    Password Policy compiled into a single pass checker.
+
+    Use PasswordChecker.compile(policy) to get it, the checker is only rebuilt when the policy values change.
+    """
+
+    _compiled: "PasswordChecker | None" = None
+
+    def __init__(self, policy: PasswordPolicy) -> None:
+        """Compile the policy."""
+        self.key = self.policy_key(policy)
+        (
+            self.active,
+            self.min_length,
+            self.max_length,
+            self.min_upper,
+            self.min_lower,
+            self.min_digits,
+            self.min_special,
+        ) = self.key
+
+    @staticmethod
+    def policy_key(policy: PasswordPolicy) -> tuple[bool, int, int, int, int, int, int]:
+        """Return the values of a policy that affect the checker."""
+        return (
+            policy.active,
+            policy.min_length,
+            policy.max_length,
+            policy.min_upper,
+            policy.min_lower,
+            policy.min_digits,
+            policy.min_special,
+        )
+
+    @classmethod
+    def compile(cls, policy: PasswordPolicy) -> "PasswordChecker":
+        """Return the checker for the policy, reusing the last one if the policy did not change."""
+        checker = cls._compiled
+        if checker is None or checker.key != cls.policy_key(policy):
+            checker = cls._compiled = cls(policy)
+        return checker
+
+    def violations(self, password: str) -> list[str]:
+        """Return every rule of the policy the password breaks, reading it only once."""
+        if not self.active:
+            return []
+        upper = lower = digits = special = 0
+        for caracter in password:
+            if caracter.isupper():
+                upper += 1
+            elif caracter.islower():
+                lower += 1
+            elif caracter.isdigit():
+                digits += 1
+            if not caracter.isalnum():
+                special += 1
+        violations = []
+        if len(password) < self.min_length:
+            violations.append(f"Password must have at least {self.min_length} characters")
+        if len(password) > self.max_length:
+            violations.append(f"Password must have at most {self.max_length} characters")
+        if upper < self.min_upper:
+            violations.append(f"Password must have at least {self.min_upper} uppercase letters")
+        if lower < self.min_lower:
+            violations.append(f"Password must have at least {self.min_lower} lowercase letters")
+        if digits < self.min_digits:
+            violations.append(f"Password must have at least {self.min_digits} digits")
+        if special < self.min_special:
+            violations.append(f"Password must have at least {self.min_special} special characters")
+        return violations
+
+
 class UserSettings(BaseModel):
     """User Configuration."""
 
@@ -136,24 +203,22 @@ class UserSettings(BaseModel):
         default=PasswordPolicy(),
     )
 
-    @root_validator
-    def settings_user_validator(cls, properties):
+    @model_validator(mode="after")
+    def settings_user_validator(self):
         """Validate settings user."""
-        if properties["password_strikes"] < 1:
+        if self.password_strikes < 1:
             raise ValueError("password_strikes must be greater than or equal to 1")
-        if properties["password_strikes"] > 128:
+        if self.password_strikes > 128:
             raise ValueError("password_strikes must be less than or equal to 128")
-        if properties["allow_login_with_email"] is False and properties["allow_login_with_username"] is False:
+        if self.allow_login_with_email is False and self.allow_login_with_username is False:
             raise ValueError("allow_login_with_email and allow_login_with_username can't be both False")
-        return properties
-
-    class Config:
-        """Set orm_mode to True to allow returning ORM objects."""
+        return self
 
-        orm_mode = True
+    # Set from_attributes to True to allow returning ORM objects.
+    model_config = ConfigDict(from_attributes=True)
 
 
-class RunningUserSettings(UserSettings, Singleton):
+class RunningUserSettings(UserSettings):
     """Running User Configuration model."""
 
     password_policy: RunningPasswordPolicy = Field(
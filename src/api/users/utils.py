@@ -0,0 +1,49 @@
+"""User Utils."""
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from api.core.state import get_state
+from api.users.orm import UserORM, bump_token_generation
+
+
+def compare_and_swap(database_session: Session, key: str, version: int, **values: Any) -> bool:
+    """
+    Update a user with a single conditional UPDATE.
+
+    The row is only changed if its version still matches the one the caller has read,
+    the version is bumped in the same statement, so no row lock is needed.
+
+    Args:
+        database_session (Session): Database session, it is not commited.
+        key (str): User key.
+        version (int): Version the caller has read.
+        **values (Any): Columns to update.
+
+    Returns:
+        bool: True if the row was updated, False if it was changed by someone else or does not exist.
+    """
+    statement = (
+        update(UserORM)
+        .where(UserORM.key == key, UserORM.version == version)
+        .values(**values, version=UserORM.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return bool(database_session.execute(statement).rowcount == 1)
+
+
+def revoke_all_tokens(database_session: Session, email: str) -> bool:
+    """
+    Invalidate every token and refresh token of a user, with a single UPDATE of its token generation.
+
+    Args:
+        database_session (Session): Database session, it is not commited.
+        email (str): User email, the subject of its tokens.
+
+    Returns:
+        bool: True if the user exists.
+    """
+    bumped = database_session.execute(bump_token_generation, {"user_email": email}).rowcount == 1
+    get_state().token_generations.pop(email, None)
+    return bool(bumped)
@@ -0,0 +1 @@
+"""Do provide benchmarks for this package."""
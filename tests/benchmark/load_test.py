@@ -0,0 +1,99 @@
+"""Load benchmark, requests against an in-process application on SQLite."""
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from api.core.database import session
+from api.core.environment import Environment
+from api.core.state import use_state
+from api.core.utils import generator
+from api.main import create_app
+from api.users.orm import UserORM
+from tests.benchmark.utils import check_baselines, measure, save_results
+
+pytestmark = pytest.mark.benchmark
+
+# Number of users to paginate, add 100000,1000000 for the full run.
+ROWS = [int(rows) for rows in os.environ.get("API_BENCHMARK_ROWS", "1000").split(",")]
+REQUESTS = 50
+# Logins hash a password, they are slow on purpose.
+LOGINS = 5
+
+
+def _seed(rows: int) -> None:
+    """Insert users until there are the number of rows."""
+    with session() as database_session:
+        missing = rows - database_session.execute(select(func.count()).select_from(UserORM)).scalar_one()
+        now = generator.now()
+        while missing > 0:
+            batch = min(missing, 10000)
+            keys = [generator.uuid() for _ in range(batch)]
+            database_session.execute(
+                insert(UserORM),
+                [
+                    {
+                        "key": key,
+                        "name": "Benchmark User",
+                        "username": "user" + key,
+                        "email": key + "@example.com",
+                        "active": True,
+                        "blocked": False,
+                        "verified": True,
+                        "password_hash": "hash",
+                        "password_strikes": 0,
+                        "password_birthday": now,
+                        "version": 1,
+                    }
+                    for key in keys
+                ],
+            )
+            database_session.commit()
+            missing -= batch
+
+
+@pytest.fixture(scope="module", name="client")
+def fixture_client(tmp_path_factory):
+    """Start an application on its own SQLite file, with a user to login."""
+    database = tmp_path_factory.mktemp("benchmark") / "database.db"
+    environment = Environment(database_connection_url=f"sqlite:///{database}", log_level="WARNING", query_budget=None)
+    application = create_app(environment)
+    with TestClient(application) as client:
+        # Do not measure while warming up
+        while client.get("/healthcheck/ready").status_code != 200:
+            time.sleep(0.05)
+        yield client
+
+
+def test_load(client):
+    """Measure the throughput and latency of the main routes, and compare them with the baselines."""
+    password = generator.password()
+    user = {"username": "benchmark", "name": "Bench Mark", "email": "bench@example.com", "password": password}
+    assert client.post("/admin/users/", json=user).status_code == 201
+    credentials = {"username": user["email"], "password": password}
+    token = client.post("/auth/login", json=credentials).json()["access_token"]
+    headers = {"Authorization": "Bearer " + token}
+
+    def request(method: str, url: str, **kwargs) -> None:
+        response = client.request(method, url, **kwargs)
+        assert response.status_code == 200, response.text
+
+    results = {
+        "POST /auth/login": measure(lambda: request("POST", "/auth/login", json=credentials), LOGINS),
+        "GET /about/": measure(lambda: request("GET", "/about/", headers=headers), REQUESTS),
+        "GET /admin/settings/": measure(lambda: request("GET", "/admin/settings/"), REQUESTS),
+        "GET /healthcheck/": measure(lambda: request("GET", "/healthcheck/"), REQUESTS),
+    }
+    for rows in sorted(ROWS):
+        with use_state(client.app.state.app_state):
+            _seed(rows)
+        # The last page is the slowest to reach
+        params = {"page": rows // 100, "records": 100}
+        results[f"GET /admin/users/ {rows} rows"] = measure(
+            lambda params=params: request("GET", "/admin/users/", params=params), REQUESTS
+        )
+    save_results("load", results)
+    regressions = check_baselines("load", results)
+    assert not regressions, regressions
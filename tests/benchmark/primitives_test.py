@@ -0,0 +1,87 @@
+"""Micro benchmarks of the core primitives."""
+import pytest
+from argon2 import PasswordHasher
+
+from api.core.database import initialize
+from api.core.environment import Environment
+from api.core.jwt.model import JWTFactory, RefreshTokenFactory
+from api.core.model import HashHandler, RandomGenerator
+from api.core.settings.utils import running_settings
+from api.core.state import AppState, use_state
+from api.users.model import UserDB, UserIn
+from tests.benchmark.utils import check_baselines, measure, save_results
+from tests.benchmark.validation_test import ORM, USER
+
+pytestmark = pytest.mark.benchmark
+
+ITERATIONS = 200
+# Argon2 costs to compare: time cost, memory cost in KiB and parallelism.
+ARGON2_COSTS = {
+    "argon2 t=1 m=19MiB p=1": (1, 19456, 1),
+    "argon2 t=2 m=19MiB p=1": (2, 19456, 1),
+    "argon2 t=3 m=64MiB p=4": (3, 65536, 4),
+}
+HASHES = 3
+
+results: dict[str, dict[str, float]] = {}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fixture_report():
+    """Report and check the results of the module, once all the benchmarks ran."""
+    yield
+    save_results("primitives", results)
+    regressions = check_baselines("primitives", results)
+    assert not regressions, regressions
+
+
+@pytest.mark.parametrize("store", ["memory", "database"])
+def test_jwt_factory(store, tmp_path):
+    """Measure creating, verifying, renewing and revoking tokens, for each revoked tokens store."""
+    with use_state(AppState(Environment(database_connection_url=f"sqlite:///{tmp_path / 'database.db'}"))):
+        initialize()
+        running_settings.jwt.jwt_revokes_store = store
+        factory = JWTFactory()
+        token = factory.create(email="john.doe@example.com")
+        # Tokens are unique by subject, each revoke needs its own.
+        tokens = iter([factory.create(email=f"{number}@example.com") for number in range(ITERATIONS)])
+        results[f"JWTFactory.create {store}"] = measure(
+            lambda: factory.create(email="john.doe@example.com"), ITERATIONS
+        )
+        results[f"JWTFactory.verify {store}"] = measure(lambda: factory.verify(token), ITERATIONS)
+        results[f"JWTFactory.renew {store}"] = measure(lambda: factory.renew(token), ITERATIONS)
+        results[f"JWTFactory.revoke {store}"] = measure(lambda: factory.revoke(next(tokens)), ITERATIONS)
+
+
+def test_refresh_token_factory(tmp_path):
+    """Measure rotating refresh tokens, the renewal path that does not write to the revoked tokens store."""
+    with use_state(AppState(Environment(database_connection_url=f"sqlite:///{tmp_path / 'database.db'}"))):
+        initialize()
+        factory = RefreshTokenFactory()
+        # Each rotation uses up its token.
+        tokens = iter([factory.create(subject=f"{number}@example.com") for number in range(ITERATIONS)])
+        results["RefreshTokenFactory.rotate"] = measure(lambda: factory.rotate(next(tokens)), ITERATIONS)
+
+
+def test_hash_handler():
+    """Measure hashing and verifying passwords, with the default and other argon2 costs."""
+    handler = HashHandler()
+    password_hash = handler.generate_hash("P@ssw0rd")
+    results["HashHandler.generate_hash"] = measure(lambda: handler.generate_hash("P@ssw0rd"), HASHES)
+    results["HashHandler.verify_hash"] = measure(lambda: handler.verify_hash("P@ssw0rd", password_hash), HASHES)
+    for name, (time_cost, memory_cost, parallelism) in ARGON2_COSTS.items():
+        hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        results[f"{name} hash"] = measure(lambda hasher=hasher: hasher.hash("P@ssw0rd"), HASHES)
+
+
+def test_random_generator():
+    """Measure generating passwords and names."""
+    generator = RandomGenerator()
+    results["RandomGenerator.password"] = measure(generator.password, ITERATIONS)
+    results["RandomGenerator.name"] = measure(generator.name, ITERATIONS)
+
+
+def test_model_validation():
+    """Measure validating the user models."""
+    results["UserIn"] = measure(lambda: UserIn(**USER), ITERATIONS)
+    results["UserDB.model_validate"] = measure(lambda: UserDB.model_validate(ORM), ITERATIONS)
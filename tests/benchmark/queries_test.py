@@ -0,0 +1,64 @@
+"""Micro benchmarks of the hot database lookups."""
+import pytest
+
+from api.core.database import initialize, session
+from api.core.environment import Behavior, Environment
+from api.core.jwt.orm import RevokedTokenORM, revoked_token
+from api.core.settings.orm import SettingsORM, settings_versions
+from api.core.state import AppState, use_state
+from api.users.orm import UserORM, user_by_email
+from tests.benchmark.utils import check_baselines, measure, save_results
+
+pytestmark = pytest.mark.benchmark
+
+ITERATIONS = 500
+EMAIL = "john.doe@example.com"
+TOKEN = bytes(16)
+
+results: dict[str, dict[str, float]] = {}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fixture_report():
+    """Report and check the results of the module, once all the benchmarks ran."""
+    yield
+    save_results("queries", results)
+    regressions = check_baselines("queries", results)
+    assert not regressions, regressions
+
+
+@pytest.fixture(name="database")
+def fixture_database(tmp_path):
+    """Return a session on a database without echo, with a user, a revoked token and a settings section."""
+    environment = Environment(
+        database_connection_url=f"sqlite:///{tmp_path / 'database.db'}", behavior=Behavior.PRODUCTION
+    )
+    with use_state(AppState(environment)):
+        initialize()
+        with session() as database_session:
+            database_session.add(UserORM(key="key", username="john", email=EMAIL, version=1))
+            database_session.add(RevokedTokenORM(jti=TOKEN))
+            database_session.add(SettingsORM(name="api", data="{}"))
+            database_session.commit()
+            yield database_session
+
+
+def test_lookups(database):
+    """Measure each hot lookup built on every call with query(), against the statement built once."""
+    lookups = {
+        "user by email": (
+            lambda: database.query(UserORM).filter(UserORM.email == EMAIL).first(),
+            lambda: database.execute(user_by_email, {"email": EMAIL}).scalar_one_or_none(),
+        ),
+        "revoked token": (
+            lambda: database.query(RevokedTokenORM).filter(RevokedTokenORM.jti == TOKEN).first(),
+            lambda: database.execute(revoked_token, {"jti": TOKEN}).first(),
+        ),
+        "settings versions": (
+            lambda: database.query(SettingsORM.name, SettingsORM.version).all(),
+            lambda: database.execute(settings_versions).all(),
+        ),
+    }
+    for name, (built, prepared) in lookups.items():
+        results[f"{name} query()"] = measure(built, ITERATIONS)
+        results[f"{name} statement"] = measure(prepared, ITERATIONS)
@@ -0,0 +1,90 @@
+"""Benchmark Utils."""
+import json
+import os
+import platform
+from hashlib import sha256
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable
+
+from scripts.load_test import percentile
+
+# Stored baselines, regenerate them with API_BENCHMARK_UPDATE=1.
+BASELINES = Path(__file__).parent / "baselines.json"
+# How much slower than the baseline a result may be, before failing.
+TOLERANCE = float(os.environ.get("API_BENCHMARK_TOLERANCE", "2.0"))
+# Slowdowns below this many milliseconds are noise of the host, whatever the ratio.
+NOISE_MS = float(os.environ.get("API_BENCHMARK_NOISE_MS", "1.0"))
+
+
+def host() -> str:
+    """Return a fingerprint of the host, timings are only comparable with baselines recorded on the same one."""
+    parts = (platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()), platform.python_version())
+    return sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def measure(function: Callable[[], Any], iterations: int) -> dict[str, float]:
+    """Call the function the number of iterations, and return the throughput and latency percentiles."""
+    samples = []
+    start = perf_counter()
+    for _ in range(iterations):
+        call = perf_counter()
+        function()
+        samples.append(perf_counter() - call)
+    elapsed = perf_counter() - start
+    return {
+        "iterations": iterations,
+        "ops_per_second": round(iterations / elapsed, 3),
+        "p50_ms": round(median(samples) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+    }
+
+
+def save_results(suite: str, results: dict[str, dict[str, float]]) -> None:
+    """Write the results as JSON, to API_BENCHMARK_OUTPUT if set, for trend comparison."""
+    print()  # noqa: T201
+    for name, result in results.items():
+        print(  # noqa: T201
+            f"{name:<40} {result['ops_per_second']:>12.1f} ops/s"
+            f" {result['p50_ms']:>10.3f} ms p50 {result['p99_ms']:>10.3f} ms p99"
+        )
+    output = os.environ.get("API_BENCHMARK_OUTPUT")
+    if output:
+        path = Path(output)
+        stored = json.loads(path.read_text()) if path.exists() else {}
+        stored[suite] = results
+        path.write_text(json.dumps(stored, indent=2, sort_keys=True))
+
+
+def _slower(milliseconds: float, baseline: float) -> bool:
+    """Return whether a time is slower than its baseline, beyond the tolerance and the noise."""
+    return milliseconds > baseline * TOLERANCE and milliseconds - baseline > NOISE_MS
+
+
+def check_baselines(suite: str, results: dict[str, dict[str, float]]) -> list[str]:
+    """
+    Compare the results with the stored baselines, and return the regressions.
+
+    With API_BENCHMARK_UPDATE=1, the baselines of the suite are replaced by the results instead.
+    Baselines recorded on another host are not checked, the timings depend on the hardware.
+    """
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    if os.environ.get("API_BENCHMARK_UPDATE") == "1":
+        baselines[suite] = results
+        baselines.setdefault("hosts", {})[suite] = host()
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return []
+    if baselines.get("hosts", {}).get(suite) != host():
+        print(f"{suite} baselines were recorded on another host, not checked")  # noqa: T201
+        return []
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(suite, {}).get(name)
+        if baseline is None:
+            continue
+        if _slower(result["p99_ms"], baseline["p99_ms"]):
+            regressions.append(f"{name}: p99 {result['p99_ms']} ms, baseline {baseline['p99_ms']} ms")
+        if _slower(1000 / result["ops_per_second"], 1000 / baseline["ops_per_second"]):
+            regressions.append(f"{name}: {result['ops_per_second']} ops/s, baseline {baseline['ops_per_second']} ops/s")
+    return regressions
@@ -0,0 +1,54 @@
+"""Model validation benchmark."""
+from time import perf_counter
+
+import pytest
+
+from api.core.settings.model import Settings
+from api.users.model import UserDB, UserIn
+from api.users.orm import UserORM
+
+pytestmark = pytest.mark.benchmark
+
+ITERATIONS = 500
+ROUNDS = 5
+
+USER = {"username": "johndoe", "name": "john doe", "email": "john.doe@example.com", "password": "P@ssw0rd"}
+ORM = UserORM(
+    key="280e686cf0c3f5d5a86aff3ca12020c923adc6c92",
+    username="johndoe",
+    name="John Doe",
+    email="john.doe@example.com",
+    active=True,
+    blocked=False,
+    verified=True,
+    password_hash="hash",
+    password_strikes=0,
+    password_birthday="2021-01-01T00:00:00",
+    version=1,
+    token_generation=0,
+)
+SETTINGS = Settings().model_dump()
+
+
+def _per_validation(function) -> float:
+    """Return the best time per validation, in microseconds."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        for _ in range(ITERATIONS):
+            function()
+        best = min(best, perf_counter() - start)
+    return best / ITERATIONS * 1_000_000
+
+
+def test_validation_cost():
+    """Report the cost of validating the hot models."""
+    costs = {
+        "UserIn": _per_validation(lambda: UserIn(**USER)),
+        "UserDB.model_validate": _per_validation(lambda: UserDB.model_validate(ORM)),
+        "Settings": _per_validation(lambda: Settings(**SETTINGS)),
+    }
+    print()  # noqa: T201
+    for name, cost in costs.items():
+        print(f"{name}: {cost:.2f} us/validation")  # noqa: T201
+        assert cost > 0
@@ -0,0 +1,64 @@
+"""Shared test fixtures."""
+from typing import Any, Callable, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.core.environment import Environment
+from api.core.state import AppState
+from api.core.utils import generator
+from api.main import create_app
+
+
+@pytest.fixture(name="environment")
+def fixture_environment(tmp_path) -> Callable[..., Environment]:
+    """Return a factory of environments, each with the database on a SQLite file of the test."""
+
+    def factory(database: str = "database.db", **fields: Any) -> Environment:
+        return Environment(database_connection_url=f"sqlite:///{tmp_path / database}", **fields)
+
+    return factory
+
+
+@pytest.fixture(name="state")
+def fixture_state(environment) -> AppState:
+    """Return a state with the database on a SQLite file of the test."""
+    return AppState(environment())
+
+
+@pytest.fixture(name="client")
+def fixture_client(environment) -> Iterator[TestClient]:
+    """Return a client of a started application, with the database on a SQLite file of the test."""
+    with TestClient(create_app(environment())) as client:
+        yield client
+
+
+@pytest.fixture(name="new_user")
+def fixture_new_user() -> Callable[[TestClient], dict]:
+    """Return a function that creates a user with a client, and returns it with its password."""
+
+    def factory(client: TestClient) -> dict:
+        payload = {
+            "username": generator.name(words=1).lower() + "user",
+            "name": generator.name(words=2),
+            "email": generator.email(),
+            "password": generator.password(),
+        }
+        response = client.post("/admin/users/", json=payload)
+        assert response.status_code == 201
+        return {**response.json(), "password": payload["password"]}
+
+    return factory
+
+
+@pytest.fixture(name="login")
+def fixture_login(new_user) -> Callable[..., dict]:
+    """Return a function that logs a user in with a client, a new one unless given, and returns the tokens."""
+
+    def factory(client: TestClient, user: dict | None = None) -> dict:
+        user = user or new_user(client)
+        response = client.post("/auth/login", json={"username": user["email"], "password": user["password"]})
+        assert response.status_code == 200
+        return dict(response.json())
+
+    return factory
@@ -0,0 +1,20 @@
+"""Application factory tests."""
+from fastapi.testclient import TestClient
+
+from api.main import create_app
+
+
+def test_applications_are_isolated(tmp_path, environment, new_user):
+    """Test that two applications in the same process do not share the database or the settings."""
+    first = create_app(environment("first.db"))
+    second = create_app(environment("second.db"))
+    with TestClient(first) as first_client, TestClient(second) as second_client:
+        user = new_user(first_client)
+        assert first_client.get(f"/admin/users/{user['key']}").status_code == 200
+        assert second_client.get(f"/admin/users/{user['key']}").status_code == 404
+        response = first_client.patch("/admin/settings/", json={"api": {"page_size_initial": 10}})
+        assert response.status_code == 200
+        assert first_client.get("/admin/settings/").json()["api"]["page_size_initial"] == 10
+        assert second_client.get("/admin/settings/").json()["api"]["page_size_initial"] == 100
+    assert (tmp_path / "first.db").exists()
+    assert (tmp_path / "second.db").exists()
@@ -0,0 +1,85 @@
+"""Auth router tests."""
+
+
+def _bearer(tokens: dict) -> dict:
+    """Return the Authorization header for the access token."""
+    return {"Authorization": "Bearer " + tokens["access_token"]}
+
+
+def test_refresh_rotates_the_tokens(client, login):
+    """Test that a refresh token gives a working access token and a new refresh token."""
+    tokens = login(client)
+    assert tokens["refresh_token"]
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/auth/validate", headers=_bearer(refreshed)).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]}).status_code == 200
+
+
+def test_reused_refresh_token_revokes_its_family(client, login):
+    """Test that using a refresh token twice revokes every refresh token of the login."""
+    tokens = login(client)
+    refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]}).status_code == 401
+
+
+def test_revoked_refresh_token(client, login):
+    """Test that a revoked refresh token, or an unknown one, can not be used."""
+    tokens = login(client)
+    assert client.post("/auth/refresh/revoke", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": "unknown"}).status_code == 401
+
+
+def test_renew(client, login):
+    """Test that renew replaces the access token, and revokes the current one."""
+    headers = _bearer(login(client))
+    response = client.get("/auth/renew", headers=headers)
+    assert response.status_code == 200
+    assert client.get("/auth/renew", headers=headers).status_code == 401
+
+
+def test_logout_revokes_the_refresh_tokens_of_the_login(client, login):
+    """Test that logging out revokes the refresh tokens of the same login, and not the ones of other logins."""
+    tokens, other = login(client), login(client)
+    refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    assert client.get("/auth/logout", headers=_bearer(refreshed)).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": other["refresh_token"]}).status_code == 200
+
+
+def test_logout_all(client, new_user, login):
+    """Test that logging out everywhere invalidates every access and refresh token of the user."""
+    user = new_user(client)
+    first, second = login(client, user), login(client, user)
+    assert client.get("/about/", headers=_bearer(first)).status_code == 200
+    assert client.post("/auth/logout/all", headers=_bearer(first)).status_code == 200
+    assert client.get("/about/", headers=_bearer(first)).status_code == 401
+    assert client.get("/about/", headers=_bearer(second)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 401
+    # A new login works
+    assert client.get("/about/", headers=_bearer(login(client, user))).status_code == 200
+
+
+def test_admin_logout_user(client, new_user, login):
+    """Test that an administrator can logout a user from every session."""
+    user = new_user(client)
+    tokens = login(client, user)
+    assert client.post(f"/admin/users/{user['key']}/logout").status_code == 200
+    assert client.get("/about/", headers=_bearer(tokens)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/admin/users/unknown/logout").status_code == 404
+
+
+def test_blocked_user_tokens_are_invalidated(client, new_user, login):
+    """Test that a user blocked by password strikes can not use the tokens it already had."""
+    user = new_user(client)
+    tokens = login(client, user)
+    assert client.get("/about/", headers=_bearer(tokens)).status_code == 200
+    for _ in range(3):
+        client.post("/auth/login", json={"username": user["email"], "password": user["password"] + "wrong"})
+    assert client.get("/about/", headers=_bearer(tokens)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code in (401, 403)
@@ -0,0 +1,21 @@
+"""Compression middleware tests."""
+
+
+def test_small_responses_are_not_compressed(client):
+    """Test that responses below the minimum size are sent as they are."""
+    response = client.get("/healthcheck/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_openapi_is_precompressed(client):
+    """Test that the OpenAPI schema is compressed once and served from memory."""
+    first = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == second.status_code == 200
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert first.json() == second.json() == client.app.openapi()
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == client.app.openapi()
@@ -0,0 +1,50 @@
+"""Healthcheck router tests."""
+import json
+import time
+
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from api.core.profiler.startup import timings
+from api.main import create_app
+
+
+def _ready(client: TestClient) -> Response:
+    """Return the readiness response, once ready or after a while."""
+    deadline = time.monotonic() + 30
+    response = client.get("/healthcheck/ready")
+    while response.status_code == 503 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get("/healthcheck/ready")
+    return response
+
+
+def test_not_ready_before_startup(environment):
+    """Test that readiness is reported false while the application did not warm up."""
+    application = create_app(environment())
+    response = TestClient(application).get("/healthcheck/ready")
+    assert response.status_code == 503
+
+
+def test_ready_after_warmup(environment):
+    """Test that readiness is reported true once the application warmed up."""
+    application = create_app(environment())
+    with TestClient(application) as client:
+        response = _ready(client)
+        assert response.status_code == 200
+        assert response.json() == {"status": "Ready."}
+    assert "warmup password hash" in timings
+    assert "warmup schemas" in timings
+
+
+def test_ready_after_a_failed_warmup_step(environment, monkeypatch, capsys):
+    """Test that a failing warmup step is logged, and the application still reported ready."""
+
+    def failing() -> None:
+        raise RuntimeError("Hash failed.")
+
+    monkeypatch.setattr("api.core.warmup.utils.hash_password", failing)
+    with TestClient(create_app(environment())) as client:
+        assert _ready(client).status_code == 200
+    entries = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    assert any(entry["level"] == "ERROR" and "password hash" in entry["message"] for entry in entries)
@@ -0,0 +1,47 @@
+"""Logs tests."""
+import json
+
+from fastapi.testclient import TestClient
+
+from api.main import create_app
+
+
+def _entries(output: str) -> list[dict]:
+    """Return the JSON log entries of an output."""
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+
+def test_access_and_audit_logs(environment, new_user, capsys):
+    """Test that requests and logins are logged as JSON, and that high volume routes are sampled."""
+    with TestClient(create_app(environment(log_sample_rate=0))) as client:
+        client.get("/healthcheck/")
+        user = new_user(client)
+        key = user["key"]
+        response = client.post("/auth/login", json={"username": user["email"], "password": "Wr0ng!Password"})
+        assert response.status_code == 403
+    entries = _entries(capsys.readouterr().out)
+    requests = [entry for entry in entries if entry.get("event") == "request"]
+    assert [entry["path"] for entry in requests] == ["/admin/users/", "/auth/login"]
+    assert requests[1]["status"] == 403
+    assert requests[1]["route"] == "/auth/login"
+    assert "duration_ms" in requests[1]
+    logins = [entry for entry in entries if entry.get("event") == "login"]
+    assert logins == [
+        {**logins[0], "logger": "api.audit", "level": "WARNING", "result": "failure", "user": key, "blocked": False}
+    ]
+
+
+def test_failed_logins_of_users_that_can_not_login_are_audited(environment, new_user, capsys):
+    """Test that logins of unknown users, or of users blocked by password strikes, are logged as failures."""
+    with TestClient(create_app(environment())) as client:
+        user = new_user(client)
+        for _ in range(3):
+            client.post("/auth/login", json={"username": user["email"], "password": user["password"] + "wrong"})
+        for username in ("unknown@example.com", user["email"]):
+            response = client.post("/auth/login", json={"username": username, "password": user["password"]})
+            assert response.status_code == 403
+    logins = [entry for entry in _entries(capsys.readouterr().out) if "username" in entry]
+    assert [(entry["level"], entry["result"], entry["username"]) for entry in logins[-2:]] == [
+        ("WARNING", "failure", "unknown@example.com"),
+        ("WARNING", "failure", user["email"]),
+    ]
@@ -0,0 +1,42 @@
+"""Metrics router tests."""
+from fastapi.testclient import TestClient
+
+from api.core.metrics.utils import request_seconds
+from api.main import create_app
+
+
+def test_metrics(environment):
+    """Test that requests, queries and hot paths are exposed on /metrics."""
+    application = create_app(environment())
+    # Metrics are shared by the process, count only the requests of this test
+    counted = request_seconds.values.get(("GET", "/admin/users/", "200"), ([], 0.0, 0))[2]
+    with TestClient(application) as client:
+        assert client.get("/admin/users/").status_code == 200
+        assert client.get("/admin/users/").status_code == 200
+        # Saved settings are not loaded again
+        assert client.patch("/admin/settings/", json={"api": {"page_size_initial": 10}}).status_code == 200
+        assert client.delete("/admin/users/unknown").status_code == 404
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            f'api_request_seconds_count{{method="GET",route="/admin/users/",status="200"}} {counted + 2}'
+            in response.text
+        )
+        assert "api_request_queries_count" in response.text
+        assert "api_database_query_seconds_count" in response.text
+        assert "api_paginator_seconds_count" in response.text
+        assert 'api_settings_cache_total{result="hit"}' in response.text
+
+
+def test_metrics_disabled(environment):
+    """Test that /metrics is not exposed when metrics are disabled, and that other applications keep recording."""
+    disabled = create_app(environment("disabled.db", metrics_enabled=False))
+    enabled = create_app(environment("enabled.db"))
+    counted = request_seconds.values.get(("GET", "/admin/users/", "200"), ([], 0.0, 0))[2]
+    with TestClient(disabled) as first, TestClient(enabled) as second:
+        assert first.get("/metrics").status_code == 404
+        assert first.get("/admin/users/").status_code == 200
+        assert request_seconds.values.get(("GET", "/admin/users/", "200"), ([], 0.0, 0))[2] == counted
+        assert second.get("/admin/users/").status_code == 200
+        assert request_seconds.values[("GET", "/admin/users/", "200")][2] == counted + 1
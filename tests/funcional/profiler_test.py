@@ -0,0 +1,47 @@
+"""Profiler tests."""
+from fastapi.testclient import TestClient
+
+from api.main import create_app
+
+
+def test_profile_request(client, login):
+    """Test that a request sent with X-Profile and a valid token returns its collapsed stacks."""
+    headers = {"X-Profile": "1", "Authorization": "Bearer " + login(client)["access_token"]}
+    response = client.get("/admin/users/", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["x-profile-status"] == "200"
+    assert response.headers["content-type"].startswith("text/plain")
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ":" in stack
+        assert int(count) > 0
+    # Only the stacks of the request, not the ones of the other threads
+    assert "api.core.warmup" not in response.text
+
+
+def test_profile_request_needs_a_token(client):
+    """Test that X-Profile is ignored without a valid access token."""
+    for headers in ({"X-Profile": "1"}, {"X-Profile": "1", "Authorization": "Bearer invalid"}):
+        response = client.get("/admin/users/", headers=headers)
+        assert response.status_code == 200
+        assert "x-profile-status" not in response.headers
+        assert response.headers["content-type"].startswith("application/json")
+
+
+def test_profiler_route(client, login):
+    """Test that the profiler route samples the worker, for authenticated users only, at a sane interval."""
+    assert client.get("/admin/profiler/", params={"seconds": 0.1}).status_code == 401
+    headers = {"Authorization": "Bearer " + login(client)["access_token"]}
+    response = client.get("/admin/profiler/", params={"seconds": 0.2, "interval": 1}, headers=headers)
+    assert response.status_code == 200
+    assert "threading:" in response.text
+    # Shorter intervals would keep the sampler walking the stacks in a tight loop
+    params = {"seconds": 0.1, "interval": 0.001}
+    assert client.get("/admin/profiler/", params=params, headers=headers).status_code == 422
+
+
+def test_profiler_not_exposed_in_production(environment):
+    """Test that the profiler is not exposed when the behavior is production, unless enabled."""
+    client = TestClient(create_app(environment(behavior="PRODUCTION")))
+    assert client.get("/admin/profiler/").status_code == 404
+    assert "x-profile-status" not in client.get("/healthcheck/ready", headers={"X-Profile": "1"}).headers
@@ -0,0 +1,31 @@
+"""Query budget tests."""
+import pytest
+from fastapi.testclient import TestClient
+
+from api.core.metrics.middleware import QueryBudgetExceeded
+from api.main import create_app
+
+# Queries each route may run, raise them only on purpose.
+BUDGET = 4
+
+
+def test_routes_within_budget(environment, new_user):
+    """Test that the main routes stay within the query budget, and report it on Server-Timing."""
+    with TestClient(create_app(environment(behavior="TESTING", query_budget=BUDGET))) as client:
+        user = new_user(client)
+        response = client.post("/auth/login", json={"username": user["email"], "password": user["password"]})
+        assert response.status_code == 200
+        assert 'desc="' in response.headers["server-timing"]
+        headers = {"Authorization": "Bearer " + response.json()["access_token"]}
+        assert client.get("/auth/validate", headers=headers).status_code == 200
+        refresh = {"refresh_token": response.json()["refresh_token"]}
+        assert client.post("/auth/refresh", json=refresh).status_code == 200
+        assert client.get("/admin/users/").status_code == 200
+        assert client.get("/healthcheck/").status_code == 200
+
+
+def test_route_over_budget_fails(environment):
+    """Test that a request over the budget fails when testing."""
+    with TestClient(create_app(environment(behavior="TESTING", query_budget=0))) as client:
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/admin/users/")
@@ -0,0 +1,86 @@
+"""Settings router tests."""
+import json
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from api.main import create_app
+
+
+def test_patch_changes_only_the_given_members(client):
+    """Test that a patch keeps the members it does not mention."""
+    assert client.patch("/admin/settings/", json={"api": {"page_size_initial": 10}}).status_code == 200
+    response = client.patch("/admin/settings/", json={"api": {"compression_level": 3}})
+    assert response.status_code == 200
+    assert response.json()["api"]["page_size_initial"] == 10
+    assert response.json()["api"]["compression_level"] == 3
+
+
+def test_patch_nested_members(client):
+    """Test that nested models are merged, and null members go back to their default."""
+    response = client.patch("/admin/settings/", json={"users": {"password_policy": {"min_special": 0}}})
+    assert response.status_code == 200
+    assert response.json()["users"]["password_policy"]["min_special"] == 0
+    assert response.json()["users"]["password_policy"]["min_length"] == 8
+    response = client.patch("/admin/settings/", json={"users": {"password_policy": {"min_special": None}}})
+    assert response.json()["users"]["password_policy"]["min_special"] == 1
+    # A section set to null goes back to its defaults
+    client.patch("/admin/settings/", json={"api": {"page_size_initial": 10}})
+    response = client.patch("/admin/settings/", json={"api": None})
+    assert response.status_code == 200
+    assert response.json()["api"]["page_size_initial"] == 100
+
+
+def test_invalid_patch_changes_nothing(client):
+    """Test that an invalid patch is rejected as a whole."""
+    response = client.patch(
+        "/admin/settings/", json={"api": {"page_size_initial": 10}, "users": {"password_strikes": 0}}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "users"]
+    response = client.patch("/admin/settings/", json={"api": {"page_size_initial": "many"}})
+    assert response.json()["detail"][0]["loc"] == ["body", "api", "page_size_initial"]
+    assert client.patch("/admin/settings/", json={"unknown": {}}).status_code == 422
+    assert client.get("/admin/settings/").json()["api"]["page_size_initial"] == 100
+
+
+def test_patch_keeps_concurrent_changes(environment):
+    """Test that a patch from an application with stale settings does not revert the changes of another one."""
+    with TestClient(create_app(environment())) as first, TestClient(create_app(environment())) as second:
+        assert first.patch("/admin/settings/", json={"api": {"page_size_initial": 10}}).status_code == 200
+        response = second.patch("/admin/settings/", json={"api": {"compression_level": 3}})
+        assert response.status_code == 200
+        assert response.json()["api"]["page_size_initial"] == 10
+
+
+def test_history_is_paged_newest_first(client):
+    """Test that every change is kept in the history, and read with a cursor."""
+    for size in (10, 20, 30):
+        client.patch("/admin/settings/", json={"api": {"page_size_initial": size}})
+    page = client.get("/admin/settings/history", params={"section": "api", "records": 2}).json()
+    assert [change["data"]["page_size_initial"] for change in page["records"]] == [30, 20]
+    assert page["records"][0]["version"] > page["records"][1]["version"]
+    page = client.get("/admin/settings/history", params={"section": "api", "records": 2, "before": page["next"]})
+    assert [change["data"]["page_size_initial"] for change in page.json()["records"]][:1] == [10]
+
+
+def test_settings_at_a_time_and_rollback(environment, capsys):
+    """Test that the settings of a point in time are read back, and restored."""
+    with TestClient(create_app(environment())) as client:
+        client.patch("/admin/settings/", json={"api": {"page_size_initial": 10}})
+        time = datetime.now(timezone.utc).isoformat()
+        client.patch("/admin/settings/", json={"api": {"page_size_initial": 20}, "jwt": {"jwt_expiration_step": 5}})
+        response = client.get("/admin/settings/history/at", params={"time": time})
+        assert response.json()["api"]["page_size_initial"] == 10
+        response = client.post("/admin/settings/history/rollback", params={"time": time})
+        assert response.status_code == 200
+        assert response.json()["api"]["page_size_initial"] == 10
+        assert client.get("/admin/settings/").json()["jwt"]["jwt_expiration_step"] == 30
+        # The rollback is a new change in the history
+        latest = client.get("/admin/settings/history", params={"records": 2}).json()["records"]
+        assert {change["section"]: change["section_version"] for change in latest} == {"api": 3, "jwt": 2}
+    # The audit entry is logged at the time of the rollback, for the time rolled back to
+    entries = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    rollback = next(entry for entry in entries if entry.get("action") == "rollback")
+    assert rollback["as_of"] == datetime.fromisoformat(time).isoformat()
+    assert datetime.fromisoformat(rollback["time"]) > datetime.fromisoformat(time)
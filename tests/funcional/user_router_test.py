@@ -0,0 +1,49 @@
+"""User router tests."""
+from api.core.utils import generator
+
+
+def test_update_user_bumps_version(client, new_user):
+    """Test that every update changes the user version."""
+    user = new_user(client)
+    assert user["version"] == 1
+    changes = {"username": user["username"], "name": generator.name(words=2), "email": user["email"]}
+    response = client.patch(f"/admin/users/{user['key']}", json=changes)
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.json()["name"] == changes["name"]
+
+
+def test_update_user_with_stale_version(client, new_user):
+    """Test that an update based on an old version is rejected."""
+    user = new_user(client)
+    changes = {"username": user["username"], "name": generator.name(words=2), "email": user["email"]}
+    response = client.patch(f"/admin/users/{user['key']}", json={**changes, "version": 1})
+    assert response.status_code == 200
+    response = client.patch(f"/admin/users/{user['key']}", json={**changes, "version": 1})
+    assert response.status_code == 409
+    response = client.get(f"/admin/users/{user['key']}")
+    assert response.json()["version"] == 2
+
+
+def test_get_users_page(client, new_user):
+    """Test the users page."""
+    user = new_user(client)
+    response = client.get("/admin/users/", params={"page": 1, "records": 10})
+    assert response.status_code == 200
+    page = response.json()
+    assert page["query"] == {"page": 1, "records": 10}
+    assert page["total_records"] >= 1
+    assert {name: value for name, value in user.items() if name != "password"} in page["records"]
+    assert "password_hash" not in page["records"][0]
+
+
+def test_update_user_keeps_tokens_unless_identity_changes(client, new_user, login):
+    """Test that tokens stay valid on updates that keep the username and email, and not on the others."""
+    user = new_user(client)
+    headers = {"Authorization": "Bearer " + login(client, user)["access_token"]}
+    changes = {"username": user["username"], "name": generator.name(words=2), "email": user["email"]}
+    assert client.patch(f"/admin/users/{user['key']}", json=changes).status_code == 200
+    assert client.get("/about/", headers=headers).status_code == 200
+    changes["email"] = generator.email()
+    assert client.patch(f"/admin/users/{user['key']}", json=changes).status_code == 200
+    assert client.get("/about/", headers=headers).status_code == 401
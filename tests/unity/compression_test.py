@@ -0,0 +1,93 @@
+"""Compression tests."""
+import asyncio
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from api.core.compression.middleware import CompressionMiddleware, Compressor, negotiate, supported_encodings
+
+
+def test_negotiate():
+    """Test Accept-Encoding negotiation."""
+    assert negotiate("") is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate("br;q=0, gzip") == "gzip"
+    assert negotiate("*") == supported_encodings()[0]
+    assert negotiate("gzip, deflate, br, zstd") == supported_encodings()[0]
+    assert negotiate("*, zstd;q=0, br;q=0") == "gzip"
+
+
+def test_compressor_round_trip():
+    """Test that every encoding can be decoded back."""
+    data = b'{"name": "John Doe", "email": "john.doe@example.com"}' * 100
+    decoders = {"gzip": gzip.decompress}
+    if "br" in supported_encodings():
+        import brotli  # pylint: disable=import-outside-toplevel
+
+        decoders["br"] = brotli.decompress
+    if "zstd" in supported_encodings():
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        decoders["zstd"] = lambda value: zstandard.ZstdDecompressor().decompressobj().decompress(value)
+    for encoding, decode in decoders.items():
+        compressor = Compressor(encoding, level=6)
+        compressed = compressor.compress(data[:1000], final=False) + compressor.compress(data[1000:], final=True)
+        assert len(compressed) < len(data)
+        assert decode(compressed) == data
+
+
+def _call(app, path: str) -> list:
+    """Call an ASGI application with a GET request accepting gzip, and return the messages it sent."""
+    messages: list = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_precompressed_responses_are_copied():
+    """Test that outer middlewares changing the headers of a precompressed response do not change the cached one."""
+
+    async def schema(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"schema" * 1000})
+
+    compression = CompressionMiddleware(schema, precompressed_paths=["/openapi.json"])
+
+    async def timing(scope, receive, send):
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("server-timing", "db;dur=1")
+            await send(message)
+
+        await compression(scope, receive, send_with_timing)
+
+    for _ in range(3):
+        start = _call(timing, "/openapi.json")[0]
+        assert Headers(raw=start["headers"]).getlist("server-timing") == ["db;dur=1"]
+        assert Headers(raw=start["headers"])["content-encoding"] == "gzip"
+
+
+def test_passthrough_responses_vary():
+    """Test that responses sent as they are still vary on Accept-Encoding."""
+
+    async def stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        await send({"type": "http.response.body", "body": b"data: 1\n\n" * 1000})
+
+    start = _call(CompressionMiddleware(stream), "/events")[0]
+    assert Headers(raw=start["headers"])["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in Headers(raw=start["headers"])
+
+
+def test_compressor_level_is_clamped():
+    """Test that levels above the highest of an encoding are clamped to it."""
+    assert gzip.decompress(Compressor("gzip", level=22).compress(b"data", final=True)) == b"data"
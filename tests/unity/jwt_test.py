@@ -0,0 +1,66 @@
+"""JWT revocation tests."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import event, update
+
+from api.core.database import initialize, session, shutdown
+from api.core.jwt.model import JWTFactory, RefreshTokenFactory
+from api.core.jwt.orm import RefreshTokenORM
+from api.core.settings.utils import running_settings
+from api.core.state import get_state, use_state
+from api.core.utils import environment
+
+
+@pytest.mark.parametrize("store", ["memory", "database"])
+def test_revocation_by_token_id(store, state):
+    """Test that revoking a token does not revoke another one minted at the same time for the same subject."""
+    with use_state(state):
+        initialize()
+        running_settings.jwt.jwt_revokes_store = store
+        factory = JWTFactory()
+        first, second = factory.create(email="john.doe@example.com"), factory.create(email="john.doe@example.com")
+        assert first != second
+        factory.revoke(first)
+        with pytest.raises(HTTPException):
+            factory.verify(first)
+        assert factory.verify(second) == "john.doe@example.com"
+        if store == "memory":
+            assert list(get_state().revoked_tokens) == [bytes.fromhex(jwt.get_unverified_claims(first)["jti"])]
+        shutdown()
+
+
+def test_token_without_jti_is_keyed_by_digest():
+    """Test that a token minted without a jti still gets a 128 bit id."""
+    token = jwt.encode({"sub": "john.doe@example.com"}, key=environment.jwt_key)
+    token_id = JWTFactory.token_id(token, {"sub": "john.doe@example.com"})
+    assert len(token_id) == 16
+    assert token_id == JWTFactory.token_id(token, {})
+
+
+def test_refresh_token_with_timezone_aware_expiration(state):
+    """Test that refresh tokens are rotated, or rejected once expired, when the database returns aware times."""
+
+    def aware(target: RefreshTokenORM, _) -> None:
+        # PostgreSQL returns the expiration with its timezone, SQLite without it
+        target.expiration = target.expiration.replace(tzinfo=timezone.utc)
+
+    event.listen(RefreshTokenORM, "load", aware)
+    try:
+        with use_state(state):
+            initialize()
+            factory = RefreshTokenFactory()
+            assert factory.rotate(factory.create("john.doe@example.com"))[0] == "john.doe@example.com"
+            expired = factory.create("john.doe@example.com")
+            with session() as database_session:
+                database_session.execute(
+                    update(RefreshTokenORM).values(expiration=datetime.utcnow() - timedelta(minutes=1))
+                )
+                database_session.commit()
+            with pytest.raises(HTTPException):
+                factory.rotate(expired)
+            shutdown()
+    finally:
+        event.remove(RefreshTokenORM, "load", aware)
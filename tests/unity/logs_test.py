@@ -0,0 +1,17 @@
+"""Logs tests."""
+import json
+import logging
+
+from api.core.logs.model import JSONFormatter
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test that records are formatted as JSON, with the extra fields."""
+    record = logging.LogRecord("api.audit", logging.INFO, __file__, 1, "Login %s.", ("failed",), None)
+    record.event = "login"
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "Login failed."
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "api.audit"
+    assert entry["event"] == "login"
+    assert "args" not in entry
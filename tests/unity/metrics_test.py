@@ -0,0 +1,29 @@
+"""Metrics tests."""
+from api.core.metrics.model import Counter, Histogram, Registry
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets are rendered cumulative."""
+    registry = Registry()
+    histogram = Histogram(registry, "test_seconds", "Test.", labels=("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+    rendered = registry.render()
+    assert "# TYPE test_seconds histogram" in rendered
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in rendered
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in rendered
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in rendered
+    assert 'test_seconds_count{route="/a"} 3' in rendered
+
+
+def test_disabled_registry_ignores_updates():
+    """Test that metrics of a disabled registry are not updated."""
+    registry = Registry(lambda: False)
+    counter = Counter(registry, "test_total", "Test.")
+    histogram = Histogram(registry, "test_seconds", "Test.")
+    counter.inc()
+    with histogram.time():
+        pass
+    assert not counter.values
+    assert not histogram.values
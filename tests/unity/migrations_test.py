@@ -0,0 +1,109 @@
+"""Database migrations tests."""
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from api.core.database import BaseModelORM, get_engine, migrate, shutdown
+from api.core.jwt.orm import RevokedTokenORM  # noqa: F401 pylint: disable=unused-import
+from api.core.settings.orm import SettingsORM  # noqa: F401 pylint: disable=unused-import
+from api.core.state import AppState, use_state
+from api.users.orm import UserORM, user_by_key  # noqa: F401 pylint: disable=unused-import
+
+
+def _indexes(table: str) -> set[str]:
+    """Return the names of the indexes of a table."""
+    return {str(index["name"]) for index in inspect(get_engine()).get_indexes(table)}
+
+
+def test_migrations_match_the_models(state):
+    """Test that the migrated schema is the one declared by the models."""
+    with use_state(state):
+        migrate()
+        with get_engine().connect() as connection:
+            assert not compare_metadata(MigrationContext.configure(connection), BaseModelORM.metadata)
+        shutdown()
+
+
+def test_index_review(state):
+    """Test that only the indexes used by the queries are kept."""
+    with use_state(state):
+        migrate()
+        assert _indexes("users") == {"ix_users_username", "ix_users_email"}
+        assert _indexes("revokedtokens") == {"ix_revokedtokens_expiration"}
+        with get_engine().connect() as connection:
+            plan = connection.execute(
+                text("EXPLAIN QUERY PLAN SELECT jti FROM revokedtokens WHERE expiration < :now"), {"now": 0}
+            ).all()
+        assert "ix_revokedtokens_expiration" in str(plan)
+        shutdown()
+
+
+def test_database_created_before_migrations_is_upgraded(state):
+    """Test that a database created by create_all is stamped with the baseline and upgraded."""
+    with use_state(state):
+        migrate("0001")
+        with get_engine().begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+            connection.execute(text("INSERT INTO users (key, username, email) VALUES ('key', 'john', 'john@a.com')"))
+        assert "version" not in {column["name"] for column in inspect(get_engine()).get_columns("users")}
+        migrate()
+        assert "ix_revokedtokens_expiration" in _indexes("revokedtokens")
+        with Session(get_engine()) as database_session:
+            user = database_session.execute(user_by_key, {"key": "key"}).scalar_one()
+            assert (user.version, user.token_generation) == (1, 0)
+        config = Config()
+        config.set_main_option("script_location", "api:migrations")
+        with get_engine().connect() as connection:
+            version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        assert version == ScriptDirectory.from_config(config).get_current_head()
+        shutdown()
+
+
+def test_settings_document_is_split_by_section(state):
+    """Test that the stored global settings document is split into one row per section."""
+    document = '{"api": {"page_size_initial": 10}, "jwt": {}, "users": {}}'
+    with use_state(state):
+        migrate("0002")
+        with get_engine().begin() as connection:
+            connection.execute(text("INSERT INTO settings (name, data) VALUES ('global', :data)"), {"data": document})
+        migrate()
+        with get_engine().connect() as connection:
+            rows = dict(connection.execute(text("SELECT name, data FROM settings")).all())
+        assert set(rows) == {"api", "jwt", "users"}
+        assert rows["api"] == '{"page_size_initial": 10}'
+        shutdown()
+
+
+def test_revoked_tokens_are_keyed_by_digest(state):
+    """Test that tokens revoked before the jti claim are kept, keyed by the digest of the token."""
+    with use_state(state):
+        migrate("0005")
+        with get_engine().begin() as connection:
+            connection.execute(
+                text("INSERT INTO revokedtokens (token, expiration) VALUES ('token', '2099-01-01 00:00:00.000000')")
+            )
+        migrate()
+        with get_engine().connect() as connection:
+            assert connection.execute(text("SELECT jti FROM revokedtokens")).scalar() == sha256(b"token").digest()[:16]
+        shutdown()
+
+
+def test_concurrent_migrations(environment):
+    """Test that workers starting together on the same database migrate it once, one after the other."""
+    states = [AppState(environment()) for _ in range(4)]
+
+    def _migrate(state: AppState) -> bool:
+        with use_state(state):
+            try:
+                return migrate()
+            finally:
+                shutdown()
+
+    with ThreadPoolExecutor(max_workers=len(states)) as executor:
+        assert all(executor.map(_migrate, states))
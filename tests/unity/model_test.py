@@ -0,0 +1,114 @@
+"""Model behavior tests."""
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from api.core.environment import Environment
+from api.core.jwt.settings import JWTSettings
+from api.core.settings.model import Settings
+from api.users.model import UserBase, UserDB, UserIn
+from api.users.orm import UserORM
+from api.users.settings import PasswordPolicy, UserSettings
+
+
+def test_user_base():
+    """Test UserBase validators."""
+    user = UserBase(username="JohnDoe", name="john doe", email="john.doe@example.com")
+    assert user.username == "johndoe"
+    assert user.name == "John Doe"
+    assert user.email == "john.doe@example.com"
+    for invalid in (
+        {"username": "john doe"},
+        {"username": "john"},
+        {"username": "j" * 65},
+        {"name": "johndoe"},
+        {"name": "j d"},
+        {"name": "j " * 65},
+        {"email": "john.doe"},
+    ):
+        with pytest.raises(ValidationError):
+            UserBase(**{"username": "johndoe", "name": "John Doe", "email": "john.doe@example.com", **invalid})
+
+
+def test_user_in_password_policy():
+    """Test that UserIn applies the running password policy."""
+    base = {"username": "johndoe", "name": "John Doe", "email": "john.doe@example.com"}
+    assert UserIn(**base, password="P@ssw0rd").password == "P@ssw0rd"
+    for invalid in ("P@ss0r", "P@ssw0rd" * 9, "p@ssw0rd", "P@SSW0RD", "P@ssword", "Passw0rd"):
+        with pytest.raises(ValidationError):
+            UserIn(**base, password=invalid)
+
+
+def test_user_db_from_attributes():
+    """Test UserDB built from an ORM object."""
+    orm = UserORM(
+        key="key",
+        username="johndoe",
+        name="John Doe",
+        email="john.doe@example.com",
+        active=True,
+        blocked=False,
+        verified=True,
+        password_hash="hash",
+        password_strikes=2,
+        password_birthday="2021-01-01T00:00:00",
+        version=3,
+        token_generation=1,
+    )
+    user = UserDB.model_validate(orm)
+    assert user.key == "key"
+    assert user.password_strikes == 2
+    assert user.version == 3
+    assert user.token_generation == 1
+    assert user.password_birthday.year == 2021
+    assert set(user.model_dump()) == {
+        "username",
+        "name",
+        "email",
+        "key",
+        "active",
+        "blocked",
+        "verified",
+        "password_hash",
+        "password_strikes",
+        "password_birthday",
+        "version",
+        "token_generation",
+    }
+
+
+def test_settings_validators():
+    """Test settings validators."""
+    with pytest.raises(ValidationError):
+        JWTSettings(jwt_expiration_initial=0)
+    with pytest.raises(ValidationError):
+        JWTSettings(jwt_expiration_initial=100, jwt_expiration_step=30, jwt_expiration_max=120)
+    with pytest.raises(ValidationError):
+        PasswordPolicy(min_upper=-1)
+    with pytest.raises(ValidationError):
+        PasswordPolicy(min_length=2)
+    with pytest.raises(ValidationError):
+        PasswordPolicy(max_length=129)
+    with pytest.raises(ValidationError):
+        UserSettings(password_strikes=0)
+    with pytest.raises(ValidationError):
+        UserSettings(allow_login_with_email=False, allow_login_with_username=False)
+
+
+def test_settings_round_trip():
+    """Test that settings survive a JSON round trip."""
+    settings = Settings(jwt=JWTSettings(jwt_expiration_initial=10), users=UserSettings(password_strikes=7))
+    loaded = Settings(**json.loads(settings.model_dump_json()))
+    assert loaded == settings
+    assert loaded.jwt.jwt_expiration_initial == 10
+    assert loaded.users.password_policy.min_length == 8
+
+
+def test_environment(monkeypatch):
+    """Test that the environment is read from variables."""
+    monkeypatch.setenv("API_DB_CONNECTION_URL", "sqlite:///other.db")
+    monkeypatch.setenv("API_BEHAVIOR", "PRODUCTION")
+    environment = Environment()
+    assert environment.database_connection_url == "sqlite:///other.db"
+    assert environment.behavior.is_debug is False
@@ -0,0 +1,53 @@
+"""Password checker tests."""
+import pytest
+from pydantic import ValidationError
+
+from api.users.model import Password
+from api.users.settings import PasswordChecker, PasswordPolicy
+
+
+def test_violations():
+    """Test that every broken rule is reported at once."""
+    checker = PasswordChecker(PasswordPolicy())
+    assert not checker.violations("P@ssw0rd")
+    assert checker.violations("password") == [
+        "Password must have at least 1 uppercase letters",
+        "Password must have at least 1 digits",
+        "Password must have at least 1 special characters",
+    ]
+    assert checker.violations("") == [
+        "Password must have at least 8 characters",
+        "Password must have at least 1 uppercase letters",
+        "Password must have at least 1 lowercase letters",
+        "Password must have at least 1 digits",
+        "Password must have at least 1 special characters",
+    ]
+    assert checker.violations("P@ssw0rd" * 9) == ["Password must have at most 64 characters"]
+    assert not PasswordChecker(PasswordPolicy(active=False)).violations("")
+
+
+def test_counts():
+    """Test the character classes."""
+    checker = PasswordChecker(PasswordPolicy(min_length=8, min_upper=2, min_lower=2, min_digits=2, min_special=2))
+    assert not checker.violations("AAbb11!!")
+    assert not checker.violations("ÁÉáé١٢ ?")
+    assert len(checker.violations("AAbb11!a")) == 1
+
+
+def test_compile_reuses_checker():
+    """Test that the checker is only rebuilt when the policy changes."""
+    policy = PasswordPolicy()
+    checker = PasswordChecker.compile(policy)
+    assert PasswordChecker.compile(policy) is checker
+    assert PasswordChecker.compile(PasswordPolicy()) is checker
+    policy.min_length = 10
+    assert PasswordChecker.compile(policy) is not checker
+    assert PasswordChecker.compile(policy).min_length == 10
+
+
+def test_password_model():
+    """Test the model validator reports every violation."""
+    assert Password(password="P@ssw0rd").password == "P@ssw0rd"
+    with pytest.raises(ValidationError) as error:
+        Password(password="password")
+    assert "uppercase" in str(error.value) and "digits" in str(error.value) and "special" in str(error.value)
@@ -0,0 +1,22 @@
+"""Profiler tests."""
+from api.core.profiler.startup import parse_importtime, timed, timings
+
+
+def test_parse_importtime():
+    """Test parsing python -X importtime output."""
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   api.core.model",
+            "import time:      1500 |       1620 | api.core.utils",
+            "some other line",
+        ]
+    )
+    assert parse_importtime(output) == [("api.core.model", 120, 120), ("api.core.utils", 1500, 1620)]
+
+
+def test_timed():
+    """Test that steps are recorded."""
+    with timed("unit test step"):
+        pass
+    assert timings["unit test step"] >= 0
@@ -0,0 +1,114 @@
+"""Read replica routing tests."""
+import asyncio
+from contextvars import copy_context
+
+from sqlalchemy import Engine
+from starlette.datastructures import Headers
+
+from api.core.database import (
+    BaseModelORM,
+    StickyReadsMiddleware,
+    get_engine,
+    get_read_engine,
+    get_replicas,
+    primary_reads_until,
+    session,
+    shutdown,
+)
+from api.core.environment import Environment
+from api.core.settings.orm import SettingsORM
+from api.core.state import AppState, use_state
+from api.core.utils import generator
+
+
+def test_environment_splits_replica_urls(monkeypatch):
+    """Test that replica urls are read as a comma separated list."""
+    monkeypatch.setenv("API_DB_REPLICA_URLS", "sqlite:///a.db, sqlite:///b.db")
+    assert Environment().database_replica_urls == ["sqlite:///a.db", "sqlite:///b.db"]
+
+
+def test_reads_without_replicas_use_the_primary(state):
+    """Test that the primary is used for reads if there are no replicas."""
+    with use_state(state):
+        assert get_read_engine() is get_engine()
+        shutdown()
+
+
+def test_reads_are_spread_over_replicas(tmp_path, environment):
+    """Test that reads use the replicas in round robin."""
+    replicas = [f"sqlite:///{tmp_path / 'first.db'}", f"sqlite:///{tmp_path / 'second.db'}"]
+    with use_state(AppState(environment(database_replica_urls=",".join(replicas)))):
+        chosen = [str(get_read_engine().url) for _ in range(4)]
+        assert chosen == [replicas[0], replicas[1], replicas[0], replicas[1]]
+        shutdown()
+
+
+def test_reads_after_a_write_use_the_primary(tmp_path, environment):
+    """Test that the reads of a client go to the primary after its writes, and the others keep using the replicas."""
+    with use_state(AppState(environment(database_replica_urls=f"sqlite:///{tmp_path / 'replica.db'}"))):
+        BaseModelORM.metadata.create_all(bind=get_engine())
+        writer = copy_context()
+        writer.run(primary_reads_until.set, [0.0])
+        assert writer.run(get_read_engine) is get_replicas()[0]
+
+        def write() -> None:
+            with session() as database_session:
+                database_session.add(SettingsORM(name="test", data="{}"))
+                database_session.commit()
+
+        writer.run(write)
+        assert writer.run(get_read_engine) is get_engine()
+        assert get_read_engine() is get_replicas()[0]
+        shutdown()
+
+
+def test_sticky_reads_cookie(tmp_path, environment):
+    """Test that the time reads go to the primary is sent on a cookie after a write, and read back from it."""
+    chosen: list[Engine] = []
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/write":
+            with session() as database_session:
+                database_session.add(SettingsORM(name=generator.uuid(), data="{}"))
+                database_session.commit()
+        chosen.append(get_read_engine())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    def call(path: str, cookie: str = "") -> Headers:
+        messages: list = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": [(b"cookie", cookie.encode())]}
+        asyncio.run(StickyReadsMiddleware(app)(scope, receive, send))
+        return Headers(raw=messages[0]["headers"])
+
+    with use_state(AppState(environment(database_replica_urls=f"sqlite:///{tmp_path / 'replica.db'}"))):
+        BaseModelORM.metadata.create_all(bind=get_engine())
+        assert "set-cookie" not in call("/read")
+        cookie = call("/write")["set-cookie"].split(";")[0]
+        assert cookie.startswith(StickyReadsMiddleware.cookie + "=")
+        call("/read", cookie)
+        call("/read")
+        assert chosen == [get_replicas()[0], get_engine(), get_engine(), get_replicas()[0]]
+        shutdown()
+
+
+def test_failing_replica_is_left_out(tmp_path, environment):
+    """Test that a replica that fails to connect is not used until retried."""
+    broken = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    healthy = f"sqlite:///{tmp_path / 'replica.db'}"
+    with use_state(AppState(environment(database_replica_urls=f"{broken},{healthy}"))) as state:
+        try:
+            with get_replicas()[0].connect():
+                pass
+        except Exception:  # pylint: disable=broad-except
+            pass
+        assert 0 in state.replicas_down
+        assert {str(get_read_engine().url) for _ in range(4)} == {healthy}
+        shutdown()
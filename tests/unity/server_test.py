@@ -0,0 +1,24 @@
+"""Production server tests."""
+import json
+
+from fastapi.testclient import TestClient
+
+from api.core.environment import Environment
+from api.main import create_app, server_options
+
+
+def test_server_options():
+    """Test that the server options are read from the environment."""
+    options = server_options(Environment(behavior="PRODUCTION", server_keep_alive=75))
+    assert options["workers"] == 1
+    assert options["timeout_keep_alive"] == 75
+    assert options["app"] == "api.main:app"
+    assert server_options(Environment(behavior="PRODUCTION", server_workers=2))["workers"] == 2
+
+
+def test_several_workers_with_memory_revokes_store_warns(environment, capsys):
+    """Test that running several workers with the memory revoked tokens store logs a warning."""
+    with TestClient(create_app(environment(server_workers=2))):
+        pass
+    entries = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    assert any(entry["level"] == "WARNING" and entry["logger"] == "api.main" for entry in entries)
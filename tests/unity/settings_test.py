@@ -0,0 +1,43 @@
+"""Settings storage tests."""
+from sqlalchemy import select
+
+from api.core.database import migrate, session, shutdown
+from api.core.settings.model import RunningSettings
+from api.core.settings.orm import SettingsORM
+from api.core.state import AppState, use_state
+
+
+def _versions() -> dict[str, int]:
+    """Return the stored version of each section."""
+    with session() as database_session:
+        return dict(database_session.execute(select(SettingsORM.name, SettingsORM.version)).all())
+
+
+def test_save_rewrites_only_the_given_sections(state):
+    """Test that saving a section bumps its version only."""
+    with use_state(state):
+        migrate()
+        settings = RunningSettings()
+        settings.save()
+        assert _versions() == {"api": 1, "jwt": 1, "users": 1}
+        settings.api.page_size_initial = 10
+        settings.save(["api"])
+        assert _versions() == {"api": 2, "jwt": 1, "users": 1}
+        shutdown()
+
+
+def test_load_applies_only_the_changed_sections(environment):
+    """Test that another instance picks up only the sections changed since its last load."""
+    with use_state(AppState(environment(database_lazzy_loader=False))):
+        migrate()
+        writer, reader = RunningSettings(), RunningSettings()
+        writer.save()
+        reader.load()
+        users = reader.users
+        writer.api.page_size_initial = 10
+        writer.save(["api"])
+        reader.load()
+        assert reader.api.page_size_initial == 10
+        # Unchanged sections are not validated again
+        assert reader.users is users
+        shutdown()
@@ -0,0 +1,46 @@
+"""SQLite tuning tests."""
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from api.core.database import BaseModelORM, get_engine, session, shutdown
+from api.core.settings.orm import SettingsORM
+from api.core.state import AppState, use_state
+
+
+def test_connections_are_tuned(state):
+    """Test that every connection gets the pragmas."""
+    with use_state(state):
+        with get_engine().connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert connection.execute(text("PRAGMA cache_size")).scalar() == -65536
+        shutdown()
+
+
+def test_tuning_can_be_disabled(environment):
+    """Test that the SQLite defaults are kept if tuning is disabled."""
+    with use_state(AppState(environment(database_sqlite_tuning=False))):
+        with get_engine().connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        shutdown()
+
+
+def test_concurrent_writes_are_serialized(state):
+    """Test that concurrent writers wait for their turn instead of failing as locked."""
+
+    def write(index: int) -> None:
+        with use_state(state), session() as database_session:
+            database_session.add(SettingsORM(name=f"setting-{index}", data="{}"))
+            database_session.flush()
+            database_session.query(SettingsORM).count()
+            database_session.commit()
+
+    with use_state(state):
+        BaseModelORM.metadata.create_all(bind=get_engine())
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write, range(40)))
+        with session() as database_session:
+            assert database_session.query(SettingsORM).count() == 40
+        shutdown()